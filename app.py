@@ -1,14 +1,21 @@
 # --------------- CONFIGURAÇÃO INICIAL ---------------
 # Importação de bibliotecas
-import joblib
 import os
+import sys
+import tempfile
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.express as px
 
 # Configuração do ambiente
 os.environ["LOKY_MAX_CPU_COUNT"] = "4"
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from scr.bundle import load_bundle
+from scr.explain import Explainer
+from scr.dataset_store import load_cube, cache_key
+from scr.labels import prepare_input
+from scr.jobs import ScoringJob, iter_upload
 
 # Configurações do Streamlit
 st.set_page_config(
@@ -19,19 +26,47 @@ st.set_page_config(
 
 st.title("📶 Case Telco Telecom")
 
+RAW_DATA_PATH = "data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv"
+MODEL_PATH = "models/classifier"
+
+# Rótulos das features no preditor, usados na explicação das predições
+FEATURE_LABELS = {
+    'gender': "Gênero",
+    'SeniorCitizen': "Idoso",
+    'Partner': "Possui parceiro",
+    'Dependents': "Dependentes",
+    'tenure': "Tempo de Contrato em Meses",
+    'PhoneService': "Serviço Telefônico",
+    'MultipleLines': "Multiplas Linhas",
+    'InternetService': "Serviço de Internet",
+    'OnlineSecurity': "Segurança Online",
+    'OnlineBackup': "Backup Online",
+    'DeviceProtection': "Proteção de Dispositivo",
+    'TechSupport': "Suporte Técnico",
+    'StreamingTV': "Streaming de TV",
+    'StreamingMovies': "Streaming de Filmes",
+    'Contract': "Tipo de Contrato",
+    'PaperlessBilling': "Fatura sem Papel",
+    'PaymentMethod': "Método de Pagamento",
+    'MonthlyCharges': "Mensalidade",
+    'TotalCharges': "Total Gasto"
+}
+
 # --------------- FUNÇÕES ---------------
 
-@st.cache_data
-def load_data():
+@st.cache_resource
+def load_model(path):
     """
-    Carrega e processa os dados do arquivo .csv
+    Carrega o bundle do modelo uma única vez por processo
     """
-    df = pd.read_csv("data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv")
-    df['SeniorCitizen'] = df['SeniorCitizen'].map({0: 'No', 1: 'Yes'})
-    df['TotalCharges'] = df['TotalCharges'].replace(' ', np.nan)
-    df['TotalCharges'] = df['TotalCharges'].astype(float)
-    
-    return df
+    return load_bundle(path)
+
+@st.cache_resource
+def load_explainer(path):
+    """
+    Explainer SHAP do modelo, compartilhado entre as sessões para reaproveitar o cache
+    """
+    return Explainer(load_model(path), cache_size = 1_000)
 
 def plot_bar(data, x, y, color, title, barmode, xlabel, ylabel):
     """
@@ -56,17 +91,19 @@ def plot_bar(data, x, y, color, title, barmode, xlabel, ylabel):
 
     return fig
 
-def plot_hist(data, x, color, title, xlabel, ylabel):
+def plot_hist(data, title, xlabel, ylabel):
     """
-    Cria um histograma utilizando Plotly Express
+    Cria um histograma com Plotly Express a partir das contagens pré-binadas do cubo
     """
-    fig = px.histogram(
+    fig = px.bar(
         data,
-        x = x,
-        color = color,
+        x = 'bin',
+        y = 'count',
+        color = 'Churn',
         barmode = 'overlay',
         title = title,
-        labels = {x: xlabel, 'count': ylabel},
+        hover_data = {'bin': False, 'bin_start': True, 'bin_end': True},
+        labels = {'bin_start': 'de', 'bin_end': 'até', 'count': ylabel},
         color_discrete_sequence=['#0f4c5c', '#9a031e']
     )
 
@@ -79,13 +116,116 @@ def plot_hist(data, x, color, title, xlabel, ylabel):
 
     return fig
 
+@st.cache_resource
+def build_figures(version):
+    """
+    Monta os gráficos do relatório e do dashboard uma vez por versão do dataset
+
+    Os gráficos saem do cubo de agregados (`scr.aggregates`): o Plotly recebe só
+    as contagens por categoria e por bin, nunca as linhas dos clientes.
+    """
+    cube = load_cube(RAW_DATA_PATH)
+
+    churn = cube.churn_share()
+    internet = cube.table('InternetService')
+    contract = cube.table('Contract')
+    pay = cube.table('PaymentMethod')
+    pm = cube.table('PaymentMethod', churned_only = True, name = 'Quantidade')
+    ct = cube.table('Contract', churned_only = True, name = 'Quantidade')
+    tenure = cube.histogram('tenure')
+    charges = cube.histogram('MonthlyCharges')
+
+    return {
+        'kpis': cube.kpis(),
+        'options': {
+            'tenure_max': cube.tenure_max,
+            'contract': cube.options('Contract'),
+            'payment': cube.options('PaymentMethod')
+        },
+        'churn': plot_bar(churn, x = 'Churn', y = 'proportion', color = 'Churn',
+                          title = 'Distribuição da Retenção de Clientes', barmode = 'relative',
+                          xlabel = 'Churn', ylabel = 'Proporção'),
+        'internet': plot_bar(internet, x = 'InternetService', y = 'Contagem', color = 'Churn',
+                             title = 'Serviço de Internet x Churn', barmode = 'group',
+                             xlabel = 'Serviço', ylabel = 'Quantidade'),
+        'contract': plot_bar(contract, x = 'Contract', y = 'Contagem', color = 'Churn',
+                             title = 'Tipo de Contrato x Churn', barmode = 'group',
+                             xlabel = 'Tipo', ylabel = 'Quantidade'),
+        'pay': plot_bar(pay, x = 'PaymentMethod', y = 'Contagem', color = 'Churn',
+                        title = 'Método de Pagamento x Churn', barmode = 'group',
+                        xlabel = 'Método', ylabel = 'Quantidade'),
+        'tenure': plot_hist(tenure,
+                            title = 'Distribuição de Churn por Tempo de Relacionamento',
+                            xlabel = 'Meses', ylabel = 'Quantidade'),
+        'charges': plot_hist(charges,
+                             title = 'Distribuição de Churn por Valor da Mensalidade',
+                             xlabel = 'USD', ylabel = 'Quantidade'),
+        'dash_pm': plot_bar(pm, x = 'PaymentMethod', y = 'Quantidade', color = None,
+                            title = 'Churn por Método de Pagamento', barmode = 'relative',
+                            xlabel = 'Método', ylabel = 'Quantidade'),
+        'dash_ct': plot_bar(ct, x = 'Contract', y = 'Quantidade', color = None,
+                            title = 'Churn por Tipo de Contrato', barmode = 'relative',
+                            xlabel = 'Tipo', ylabel = 'Quantidade'),
+        'dash_tenure': plot_hist(tenure,
+                                 title = 'Churn por Tempo de Relacionamento',
+                                 xlabel = 'Meses', ylabel = 'Quantidade'),
+        'dash_charges': plot_hist(charges,
+                                  title = 'Churn por Valor da Mensalidade',
+                                  xlabel = 'USD', ylabel = 'Quantidade')
+    }
+
+@st.fragment(run_every = 1.0)
+def batch_progress(job):
+    """
+    Mostra o progresso da pontuação em lote sem bloquear o restante da página
+
+    Ao terminar, dispara uma única execução completa da página; como o fragmento
+    não é mais chamado, a atualização periódica para.
+    """
+    st.progress(job.fraction, text = f"{job.rows:,} linhas pontuadas")
+    for warning in job.warnings:
+        st.warning(warning)
+
+    if not job.is_alive():
+        st.rerun()
+
+def batch_result(job):
+    """
+    Resultado da pontuação em lote: erro ou drift detectado e o botão de download
+
+    O botão recebe o arquivo de saída aberto, sem uma cópia guardada na sessão;
+    o Streamlit ainda o lê inteiro para servir o download.
+    """
+    st.progress(job.fraction, text = f"{job.rows:,} linhas pontuadas")
+    for warning in job.warnings:
+        st.warning(warning)
+
+    if job.error is not None:
+        st.error(f"Erro na pontuação: {job.error}")
+        return
+
+    if job.monitor is not None:
+        report = job.monitor.report()
+        flagged = report[report['status'] != 'ok']
+        if not flagged.empty:
+            st.warning("O arquivo difere dos dados de treino nas features abaixo (drift ou qualidade dos dados)")
+            st.dataframe(flagged)
+
+    with open(job.output_path, 'rb') as f:
+        st.download_button(
+            "Baixar predições",
+            f,
+            file_name = os.path.basename(job.output_path),
+            mime = "application/octet-stream"
+        )
+
 # --------------- DADOS ---------------
 
-df = load_data()
-model = joblib.load("models/classifier.pkl")
+figures = build_figures(cache_key(RAW_DATA_PATH))
+fast_model = load_model(MODEL_PATH)
 
 # --------------- TABS ---------------
-tab_report, tab_pred, tab_analytics = st.tabs(["📝 Relatório","🤖 Preditor", "📊 Dashboard"])
+tab_report, tab_pred, tab_batch, tab_analytics = st.tabs(["📝 Relatório","🤖 Preditor", "📂 Lote", "📊 Dashboard"])
 
 # ------------- RELATÓRIO DE ANÁLISE -------------
 with tab_report:
@@ -166,22 +306,7 @@ with tab_report:
         '''
     )
 
-    churn = df['Churn'].value_counts(normalize = True).reset_index()
-    churn['proportion'] = (churn['proportion'] * 100).round(2)
-
-    st.plotly_chart(
-        plot_bar(
-            churn, 
-            x = 'Churn', 
-            y = 'proportion', 
-            color = 'Churn', 
-            title = 'Distribuição da Retenção de Clientes', 
-            barmode = 'relative',
-            xlabel = 'Churn', 
-            ylabel = 'Proporção'
-        ), 
-        use_container_width=True
-    )
+    st.plotly_chart(figures['churn'], use_container_width=True)
     st.write(
         '''
         A retenção de clientes é um dos grandes desafios no setor de telefonia, a Telco Telecom 
@@ -195,21 +320,7 @@ with tab_report:
         '''
     )
 
-    internet = df.groupby(['Churn', 'InternetService']).agg(Contagem = ('InternetService', 'count')).reset_index()
-
-    st.plotly_chart(
-        plot_bar(
-            internet, 
-            x = 'InternetService', 
-            y = 'Contagem', 
-            color = 'Churn', 
-            title = 'Serviço de Internet x Churn', 
-            barmode = 'group',
-            xlabel = 'Serviço', 
-            ylabel = 'Quantidade'
-        ), 
-        use_container_width=True
-    )
+    st.plotly_chart(figures['internet'], use_container_width=True)
     st.markdown(
         '''
         O serviço de fibra ótica é o segundo mais utilizando entre os de internet mas possui uma alta 
@@ -219,19 +330,7 @@ with tab_report:
         '''
     )
 
-    contract = df.groupby(['Churn', 'Contract']).agg(Contagem = ('Contract', 'count')).reset_index()
-    contract_plot = plot_bar(
-            contract,
-            x = 'Contract',
-            y = 'Contagem',
-            color = 'Churn',
-            title = 'Tipo de Contrato x Churn',
-            barmode = 'group',
-            xlabel = 'Tipo',
-            ylabel = 'Quantidade'
-            )
-
-    st.plotly_chart(contract_plot, use_container_width=True)
+    st.plotly_chart(figures['contract'], use_container_width=True)
     st.markdown(
         '''
         O contrato de renovação mensal é o mais frequente e o com maior proporção de Churn, os outros 
@@ -242,18 +341,7 @@ with tab_report:
         '''
     )
 
-    pay = df.groupby(['Churn', 'PaymentMethod']).agg(Contagem = ('PaymentMethod', 'count')).reset_index()
-    pay_plot = plot_bar(
-            pay,
-            x = 'PaymentMethod',
-            y = 'Contagem',
-            color = 'Churn',
-            title = 'Método de Pagamento x Churn',
-            barmode = 'group',
-            xlabel = 'Método',
-            ylabel = 'Quantidade'
-        )
-    st.plotly_chart(pay_plot, use_container_width=True)
+    st.plotly_chart(figures['pay'], use_container_width=True)
 
     st.markdown(
         '''
@@ -264,15 +352,7 @@ with tab_report:
         ### 3.4. Tempo de Relacionamento
         '''
     )
-    tenure_plot = plot_hist(
-            df,
-            x = 'tenure',
-            color = 'Churn',
-            title = 'Distribuição de Churn por Tempo de Relacionamento',
-            xlabel = 'Meses',
-            ylabel = 'Quantidade'
-        )
-    st.plotly_chart(tenure_plot, use_container_width=True)
+    st.plotly_chart(figures['tenure'], use_container_width=True)
     
     st.markdown(
         '''
@@ -283,15 +363,7 @@ with tab_report:
         ### 3.5. Fatura Mensal
         '''
     )
-    charges_plot = plot_hist(
-            df,
-            x = 'MonthlyCharges',
-            color = 'Churn',
-            title = 'Distribuição de Churn por Valor da Mensalidade',
-            xlabel = 'USD',
-            ylabel = 'Quantidade'
-        )
-    st.plotly_chart(charges_plot, use_container_width=True)
+    st.plotly_chart(figures['charges'], use_container_width=True)
     st.markdown(
         '''
         Assim como o comportamento em relação a contratos recentes, decidi também testar a hipotése 
@@ -335,7 +407,7 @@ with tab_pred:
     senior = st.selectbox("Idoso", ["Sim", "Não"])
     partner = st.selectbox("Possui parceiro", ["Sim", "Não"])
     dependents = st.selectbox("Dependentes", ["Sim", "Não"])
-    tenure = st.number_input("Tempo de Contrato em Meses", min_value = 1, max_value = df['tenure'].max(), value = 1)
+    tenure = st.number_input("Tempo de Contrato em Meses", min_value = 1, max_value = figures['options']['tenure_max'], value = 1)
     phoneservice = st.selectbox("Serviço Telefônico", ["Sim", "Não"])
     lines = st.selectbox("Multiplas Linhas", ["Sim", "Não", "Não possui linha"])
     internetservice = st.selectbox("Serviço de Internet", ["DSL", "Fibra ótica", "Não"])
@@ -345,9 +417,11 @@ with tab_pred:
     techsupport = st.selectbox("Suporte Técnico", ["Sim", "Não", "Não possui internet"])
     streamingtv = st.selectbox("Streaming de TV", ["Sim", "Não", "Não possui internet"])
     streamingmovies = st.selectbox("Streaming de Filmes", ["Sim", "Não", "Não possui internet"])
-    contract = st.selectbox("Tipo de Contrato", list(df["Contract"].unique()))
+    contract_options, contract_default = figures['options']['contract']
+    contract = st.selectbox("Tipo de Contrato", contract_options, index = contract_default)
     paperless = st.selectbox("Fatura sem Papel", ["Sim", "Não"])
-    paymethod = st.selectbox("Método de Pagamento", list(df["PaymentMethod"].unique()))
+    payment_options, payment_default = figures['options']['payment']
+    paymethod = st.selectbox("Método de Pagamento", payment_options, index = payment_default)
     monthlycharge = st.slider("Mensalidade", 20, 120)
 
     # Dicionário de entrada
@@ -373,100 +447,81 @@ with tab_pred:
         'TotalCharges': tenure * monthlycharge
     }
 
-    # Criando DataFrame com os dados inseriados
-    input_df = pd.DataFrame(input_features, index = [0])
-
-    # Mapeamento das respotas
-    mapping = {
-        'Masculino': 'Male',
-        'Feminino': 'Female',
-        'Sim': 'Yes',
-        'Não': 'No',
-        'Fibra ótica': 'Fiber optic',
-        'Não possui linha': 'No phone service',
-        'Não possui internet': 'No internet service'
-    }
+    # Criando DataFrame com os dados inseriados e traduzindo as respostas
+    input_df, input_errors = prepare_input(pd.DataFrame(input_features, index = [0]))
 
-    input_df = input_df.applymap(lambda x: mapping.get(x, x))
+    for error in input_errors:
+        st.warning(error)
 
     with st.container():
         if st.button("Resultado"):
-            prob = model.predict_proba(input_df)[:,1][0]
-            if prob > 0.40:
+            prob = fast_model.predict_proba(input_df)[:,1][0]
+            if prob > fast_model.threshold:
                 st.markdown("## Alto Potencial de Cancelamento")
                 st.error(f"Probabilidade de {prob:.2%}")
             else:
                 st.markdown("## Baixo Potencial de Cancelamento")
                 st.success(f"Probabilidade de {prob:.2%} ")
 
+            drivers = load_explainer(MODEL_PATH).explain(input_df, top_k = 3).iloc[0]
+            st.markdown("#### Principais fatores de churn")
+            for i in range(1, 4):
+                impact = drivers[f'driver_{i}_impact']
+                st.markdown(f"- {FEATURE_LABELS[drivers[f'driver_{i}']]} ({'+' if impact >= 0 else ''}{impact:.2f})")
+
+# ------------- PONTUAÇÃO EM LOTE -------------
+with tab_batch:
+    st.header("📂 Pontuação em Lote")
+    st.subheader("Envie um Arquivo e Baixe as Predições")
+
+    uploaded = st.file_uploader("Arquivo com os dados dos clientes", type = ["csv", "parquet"])
+    output_format = st.radio("Formato de saída", ["parquet", "csv"], horizontal = True)
+
+    # Um arquivo por vez: a pasta do job anterior só é apagada depois que ele termina
+    job = st.session_state.get('scoring_job')
+    running = job is not None and job.is_alive()
+
+    if uploaded is not None and st.button("Pontuar arquivo", disabled = running):
+        # A pasta temporária é apagada ao ser substituída ou, no fim da sessão,
+        # quando o estado da sessão é descartado (TemporaryDirectory se limpa ao ser coletado)
+        previous_dir = st.session_state.get('scoring_dir')
+        if previous_dir is not None:
+            previous_dir.cleanup()
+
+        workdir = tempfile.TemporaryDirectory(prefix = "churn-lote-")
+        output_path = os.path.join(workdir.name, f"predicoes.{output_format}")
+        job = ScoringJob(fast_model, iter_upload(uploaded, uploaded.name), output_path, output_format)
+        job.start()
+        st.session_state['scoring_job'] = job
+        st.session_state['scoring_dir'] = workdir
+
+    if job is not None and job.is_alive():
+        batch_progress(job)
+    elif job is not None:
+        batch_result(job)
+
 # ------------- DASHBOARD ANALÍTICO -------------
 with tab_analytics:
     st.subheader("📊 Dashboard Análitico")
     # KPIs
+    kpis = figures['kpis']
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        st.metric(label = "Total de Clientes", value = df.shape[0])
+        st.metric(label = "Total de Clientes", value = kpis['clientes'])
     with col2:
-        st.metric(label = "Taxa de Churn", value = f"{(df['Churn'].map({'No': 0, 'Yes': 1}).mean() * 100):.2f} %")
+        st.metric(label = "Taxa de Churn", value = f"{kpis['churn']:.2f} %")
     with col3:
-        st.metric(label = "Lifetime Value Médio", value = f"$ {df['TotalCharges'].mean():.2f}")
+        st.metric(label = "Lifetime Value Médio", value = f"$ {kpis['ltv']:.2f}")
     with col4:
-        st.metric(label = "Tempo Médio de Contrato", value = f"{df['tenure'].mean():.0f} meses")
+        st.metric(label = "Tempo Médio de Contrato", value = f"{kpis['tenure']:.0f} meses")
 
     # Gráficos
     col1, col2 = st.columns(2)
 
-    pm = df[df['Churn'] == 'Yes'].groupby(['Churn', 'PaymentMethod']).agg(Quantidade = ('PaymentMethod', 'count')).reset_index()
-    ct = df[df['Churn'] == 'Yes'].groupby(['Churn', 'Contract']).agg(Quantidade = ('Contract', 'count')).reset_index()
-
     with col1:
-        st.plotly_chart(
-            plot_bar(
-                pm,
-                x = 'PaymentMethod',
-                y = 'Quantidade',
-                color = None,
-                title = 'Churn por Método de Pagamento',
-                barmode = 'relative',
-                xlabel='Método',
-                ylabel='Quantidade'
-        ),
-        use_container_width=True
-        )
-        st.plotly_chart(
-            plot_hist(
-            df,
-            x = 'tenure',
-            color = 'Churn',
-            title = 'Churn por Tempo de Relacionamento',
-            xlabel = 'Meses',
-            ylabel = 'Quantidade'
-        ),
-        use_container_width=True
-        )
+        st.plotly_chart(figures['dash_pm'], use_container_width=True)
+        st.plotly_chart(figures['dash_tenure'], use_container_width=True)
     with col2:
-        st.plotly_chart(
-            plot_bar(
-                ct,
-                x = 'Contract',
-                y = 'Quantidade',
-                color = None,
-                title = 'Churn por Tipo de Contrato',
-                barmode = 'relative',
-                xlabel='Tipo',
-                ylabel='Quantidade'
-        ),
-        use_container_width=True
-        )
-        st.plotly_chart(
-            plot_hist(
-            df,
-            x = 'MonthlyCharges',
-            color = 'Churn',
-            title = 'Churn por Valor da Mensalidade',
-            xlabel = 'USD',
-            ylabel = 'Quantidade'
-        ),
-        use_container_width=True
-        )
\ No newline at end of file
+        st.plotly_chart(figures['dash_ct'], use_container_width=True)
+        st.plotly_chart(figures['dash_charges'], use_container_width=True)
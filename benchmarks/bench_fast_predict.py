@@ -0,0 +1,63 @@
+"""
+Benchmark de latência do pontuador rápido (FastScorer) contra o Pipeline
+
+Mede p50/p99 por chamada de uma linha e o throughput em lote, e verifica
+que as probabilidades do caminho rápido são idênticas às do Pipeline.
+
+Uso: python benchmarks/bench_fast_predict.py
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from scr.utils import load_pipeline
+from scr.fast_predict import FastScorer
+
+def latencies(fn, inputs):
+    """
+    Tempo de cada chamada de `fn`, em microssegundos
+    """
+    fn(inputs[0])
+    times = []
+    for item in inputs:
+        start = time.perf_counter()
+        fn(item)
+        times.append(time.perf_counter() - start)
+    return np.array(times) * 1e6
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser(description = "Benchmark do pontuador rápido")
+    parser.add_argument("--input", default = "data/processed/test.csv")
+    parser.add_argument("--model", default = "models/classifier")
+    parser.add_argument("--calls", type = int, default = 500)
+    args = parser.parse_args()
+
+    data = pd.read_csv(args.input)
+    pipeline = load_pipeline(args.model)
+    scorer = FastScorer.from_pipeline(pipeline)
+
+    diff = np.abs(pipeline.predict_proba(data)[:, 1] - scorer.predict_proba(data)[:, 1]).max()
+    print(f"Diferença máxima de probabilidade: {diff:.2e}")
+
+    rows = [data.iloc[[i % len(data)]] for i in range(args.calls)]
+    records = [row.iloc[0].to_dict() for row in rows]
+
+    print(f"\n{'caminho':<20} {'p50 (us)':>10} {'p99 (us)':>10}")
+    for name, fn, inputs in [
+        ('pipeline', pipeline.predict_proba, rows),
+        ('fast (DataFrame)', scorer.predict_proba, rows),
+        ('fast (dict)', scorer.predict_proba, records)
+    ]:
+        lat = latencies(fn, inputs)
+        print(f"{name:<20} {np.percentile(lat, 50):>10.0f} {np.percentile(lat, 99):>10.0f}")
+
+    print(f"\n{'caminho':<20} {'linhas/s':>12}")
+    for name, fn in [('pipeline', pipeline.predict_proba), ('fast', scorer.predict_proba)]:
+        start = time.perf_counter()
+        fn(data)
+        print(f"{name:<20} {len(data) / (time.perf_counter() - start):>12,.0f}")
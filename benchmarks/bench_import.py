@@ -0,0 +1,87 @@
+"""
+Orçamento de tempo de importação dos subcomandos de `python -m scr`
+
+Para cada subcomando importa o seu módulo em um interpretador novo, várias
+vezes, e registra o menor tempo. Também verifica que os subcomandos de
+pontuação não carregam a pilha de treino. Termina com código 1 se algum
+subcomando estourar o orçamento ou importar um pacote proibido.
+
+Uso: python benchmarks/bench_import.py --runs 5
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+sys.path.insert(0, ROOT)
+
+from scr.__main__ import COMMANDS
+
+# Tempo máximo de importação por subcomando, em segundos
+IMPORT_BUDGET_S = {
+    'predict': 0.8,
+    'serve': 0.8,
+    'evaluate': 1.6,
+    'train': 2.5,
+    'compare': 2.5,
+    'tune': 2.5,
+    'threshold': 0.8,
+    'retrain': 2.5
+}
+
+TRAINING_STACK = ['sklearn', 'catboost', 'category_encoders', 'feature_engine', 'statsmodels', 'joblib']
+
+# Pacotes que não podem ser importados por cada subcomando
+FORBIDDEN = {
+    'predict': TRAINING_STACK,
+    'serve': TRAINING_STACK
+}
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import scr.{module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'modules': sorted({{name.split('.')[0] for name in sys.modules}})}}))
+"""
+
+def measure(module, runs):
+    """
+    Menor tempo de importação de `scr.<module>` em `runs` interpretadores novos e os pacotes carregados
+    """
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module = module)],
+            cwd = ROOT, capture_output = True, text = True, check = True
+        ).stdout
+        results.append(json.loads(output))
+
+    return min(r['seconds'] for r in results), set(results[0]['modules'])
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser(description = "Orçamento de tempo de importação dos subcomandos")
+    parser.add_argument("--runs", type = int, default = 5)
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'subcomando':<10} {'importação (s)':>15} {'orçamento (s)':>14}  pilha de treino carregada")
+    for command, (module, _) in COMMANDS.items():
+        seconds, modules = measure(module, args.runs)
+        loaded = [name for name in TRAINING_STACK if name in modules]
+        print(f"{command:<10} {seconds:>15.2f} {IMPORT_BUDGET_S[command]:>14.2f}  {', '.join(loaded) or '-'}")
+
+        if seconds > IMPORT_BUDGET_S[command]:
+            failures.append(f"{command}: {seconds:.2f}s acima do orçamento de {IMPORT_BUDGET_S[command]:.2f}s")
+        forbidden = [name for name in FORBIDDEN.get(command, []) if name in modules]
+        if forbidden:
+            failures.append(f"{command}: importa {', '.join(forbidden)}")
+
+    if failures:
+        print("\nFalhas:")
+        print("\n".join(failures))
+        sys.exit(1)
+    print("\nTodos os subcomandos dentro do orçamento.")
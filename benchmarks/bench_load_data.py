@@ -0,0 +1,74 @@
+"""
+Benchmark de carregamento do dataset: leitura antiga x esquema declarado
+
+Compara o caminho anterior de `load_data` (tipos inferidos e conversões coluna
+a coluna) com o novo (esquema declarado, engines c e pyarrow) em tempo de
+carregamento, pico de RSS e memória do DataFrame resultante. Cada medição roda
+em um processo separado para que o pico de RSS não seja contaminado.
+
+Uso: python benchmarks/bench_load_data.py --rows 1000000
+"""
+import os
+import sys
+import time
+import argparse
+import resource
+import tempfile
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from scr.utils import load_data
+
+def legacy_load_data(path):
+    """
+    Caminho anterior: tipos inferidos e uma cópia por conversão
+    """
+    df = pd.read_csv(path)
+    df['SeniorCitizen'] = df['SeniorCitizen'].map({0: 'No', 1: 'Yes'})
+    df['Churn'] = df['Churn'].map({'No': 0, 'Yes': 1})
+    df['TotalCharges'] = df['TotalCharges'].replace(' ', np.nan)
+    df['TotalCharges'] = df['TotalCharges'].astype(float)
+    return df
+
+def measure(method, path):
+    """
+    Executa um carregamento e retorna tempo, aumento do pico de RSS (MB) e memória do DataFrame (MB)
+    """
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if method == 'legacy':
+        df = legacy_load_data(path)
+    else:
+        df = load_data(path, engine = method)
+    elapsed = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return elapsed, (rss_after - rss_before) / 1024, df.memory_usage(deep = True).sum() / 1024 ** 2
+
+def replicate_csv(path, n_rows, out_path):
+    """
+    Replica o CSV original até `n_rows` linhas
+    """
+    data = pd.read_csv(path, dtype = str, keep_default_na = False)
+    reps = -(-n_rows // len(data))
+    pd.concat([data] * reps, ignore_index = True).iloc[:n_rows].to_csv(out_path, index = False)
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser(description = "Benchmark de carregamento dos dados")
+    parser.add_argument("--input", default = "data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv")
+    parser.add_argument("--rows", type = int, default = None, help = "Replica o CSV até este número de linhas")
+    args = parser.parse_args()
+
+    path = args.input
+    if args.rows:
+        path = os.path.join(tempfile.mkdtemp(), "telco.csv")
+        replicate_csv(args.input, args.rows, path)
+
+    print(f"{'caminho':<10} {'tempo (s)':>10} {'pico RSS (MB)':>14} {'DataFrame (MB)':>15}")
+    for method in ['legacy', 'c', 'pyarrow']:
+        with ProcessPoolExecutor(max_workers = 1) as executor:
+            elapsed, rss, frame = executor.submit(measure, method, path).result()
+        print(f"{method:<10} {elapsed:>10.2f} {rss:>14.1f} {frame:>15.1f}")
@@ -0,0 +1,73 @@
+"""
+Benchmark de escalabilidade da pontuação paralela
+
+Replica o conjunto de teste até `--rows` linhas, grava em Parquet e mede o
+throughput (linhas/s) de `score_file` (leitura, pontuação e escrita, como no
+`predict`) serial e com o ParallelScorer de 1, 2, 4, ... workers.
+
+Uso: python benchmarks/bench_parallel.py --rows 200000
+"""
+import os
+import sys
+import argparse
+import tempfile
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from scr.utils import load_model
+from scr.predict import score_file
+from scr.parallel import ParallelScorer
+
+def replicate(data, n_rows):
+    """
+    Replica o DataFrame até atingir `n_rows` linhas
+    """
+    reps = -(-n_rows // len(data))
+    return pd.concat([data] * reps, ignore_index = True).iloc[:n_rows]
+
+def worker_counts(max_workers):
+    """
+    Sequência 1, 2, 4, ... até `max_workers`
+    """
+    counts, n = [], 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    return counts + [max_workers]
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser(description = "Benchmark da pontuação paralela")
+    parser.add_argument("--input", default = "data/processed/test.csv")
+    parser.add_argument("--model", default = "models/classifier")
+    parser.add_argument("--rows", type = int, default = 200_000)
+    parser.add_argument("--chunksize", type = int, default = 100_000)
+    parser.add_argument("--batch-size", type = int, default = 10_000)
+    parser.add_argument("--shard-size", type = int, default = 5_000)
+    parser.add_argument("--max-workers", type = int, default = os.cpu_count())
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    input_path = os.path.join(workdir, "input.parquet")
+    output_path = os.path.join(workdir, "predictions.parquet")
+    data = replicate(pd.read_csv(args.input), args.rows)
+    data.to_parquet(input_path)
+
+    _, serial = score_file(load_model(args.model), input_path, output_path, args.chunksize, args.batch_size)
+    reference = pd.read_parquet(output_path)['pred_probability']
+
+    print(f"{'workers':>8} {'tempo (s)':>10} {'linhas/s':>12} {'speedup':>8}")
+    print(f"{'serial':>8} {serial:>10.2f} {len(data) / serial:>12,.0f} {1.0:>8.2f}")
+
+    for n_workers in worker_counts(args.max_workers):
+        with ParallelScorer(args.model, n_workers, args.shard_size) as scorer:
+            # Aquece o pool para não medir o carregamento do modelo
+            scorer.predict_proba(data.iloc[:n_workers * args.shard_size])
+
+            # Mesmos lotes do `predict --workers`: o bloco inteiro por chamada
+            _, elapsed = score_file(scorer, input_path, output_path, args.chunksize,
+                                    max(args.batch_size, args.chunksize))
+
+        probabilities = pd.read_parquet(output_path)['pred_probability']
+        assert (probabilities == reference).all(), "Resultado paralelo difere do serial"
+        print(f"{n_workers:>8} {elapsed:>10.2f} {len(data) / elapsed:>12,.0f} {serial / elapsed:>8.2f}")
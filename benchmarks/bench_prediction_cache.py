@@ -0,0 +1,81 @@
+"""
+Paridade e ganho do cache de predições (`scr.prediction_cache`)
+
+Treina um modelo pequeno em um dataset sintético e pontua o mesmo arquivo em
+lotes: sem cache, com o cache vazio (primeira execução), com o cache cheio
+(reexecução) e após alterar uma fração das linhas (clientes que mudaram).
+Termina com código 1 se alguma probabilidade diferir da pontuação sem cache.
+
+Uso: python benchmarks/bench_prediction_cache.py --rows 500k --changed 0.1
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from synthetic import generate, parse_size
+from scr.utils import load_data, FEATURES, TARGET
+from scr.data_preprocessing import get_preprocessor
+from scr.train_model import train_model, class_weights, build_pipeline, DEFAULT_PARAMS
+from scr.fast_predict import FastScorer
+from scr.prediction_cache import PredictionCache
+from scr.predict import make_predictions
+
+def score(model, data, batch_size, cache = None):
+    """
+    Pontua `data` em lotes e retorna o tempo e as probabilidades
+    """
+    start = time.perf_counter()
+    probabilities = np.concatenate([
+        make_predictions(model, data.iloc[i:i + batch_size], cache = cache)[1]
+        for i in range(0, len(data), batch_size)
+    ])
+
+    return time.perf_counter() - start, probabilities
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser(description = "Paridade e ganho do cache de predições")
+    parser.add_argument("--rows", default = "500k", help = "Linhas do dataset sintético (ex.: 100k, 1m)")
+    parser.add_argument("--changed", type = float, default = 0.1, help = "Fração de clientes alterados na última rodada")
+    parser.add_argument("--batch-size", type = int, default = 10_000)
+    parser.add_argument("--train-iterations", type = int, default = 300)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    path = os.path.join(workdir, f"telco_{args.rows}.csv")
+    generate(parse_size(args.rows), path)
+    data = load_data(path)
+
+    preprocessor = get_preprocessor()
+    X = preprocessor.fit_transform(data[FEATURES], data[TARGET])
+    model = train_model(X, data[TARGET], class_weights(data[TARGET]), {**DEFAULT_PARAMS, 'iterations': args.train_iterations})
+    scorer = FastScorer.from_pipeline(build_pipeline(model, preprocessor))
+    data = data[FEATURES]
+
+    changed = data.copy()
+    rows = np.random.default_rng(42).random(len(changed)) < args.changed
+    changed.loc[rows, 'MonthlyCharges'] += 1
+
+    plain_s, expected = score(scorer, data, args.batch_size)
+    _, expected_changed = score(scorer, changed, args.batch_size)
+    print(f"{'rodada':<16} {'tempo (s)':>10} {'acerto':>8} {'não pontuadas':>14}")
+    print(f"{'sem cache':<16} {plain_s:>10.2f} {'-':>8} {'-':>14}")
+
+    cache_dir = os.path.join(workdir, "cache")
+    failures = []
+    for name, frame, reference in [('cache vazio', data, expected), ('cache cheio', data, expected),
+                                   (f'{args.changed:.0%} alterados', changed, expected_changed)]:
+        with PredictionCache(cache_dir, 'bench') as cache:
+            elapsed, probabilities = score(scorer, frame, args.batch_size, cache)
+        stats = cache.stats()
+        print(f"{name:<16} {elapsed:>10.2f} {stats['hit_rate']:>8.1%} {stats['saved']:>14.1%}")
+        if np.abs(probabilities - reference).max() > 0:
+            failures.append(name)
+
+    if failures:
+        print(f"\nProbabilidades diferentes da pontuação sem cache: {', '.join(failures)}")
+        sys.exit(1)
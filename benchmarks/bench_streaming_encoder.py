@@ -0,0 +1,82 @@
+"""
+Paridade e memória do StreamingTargetEncoder contra CategoricalImputer + TargetEncoder
+
+Ajusta os dois pré-processadores (`get_preprocessor()` e
+`get_preprocessor(streaming = True)`) no mesmo treino, com uma fração de nulos
+injetada nas categóricas, e compara as matrizes transformadas no teste,
+incluindo categorias desconhecidas. Cada ajuste roda em um processo separado
+para medir o aumento do pico de RSS. Termina com código 1 se as saídas diferirem.
+
+Uso: python benchmarks/bench_streaming_encoder.py --rows 1000000
+"""
+import os
+import sys
+import gc
+import time
+import argparse
+import tempfile
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from synthetic import generate, parse_size
+from scr.utils import load_data, split_data, peak_rss_mb, FEATURES, TARGET
+from scr.data_preprocessing import get_preprocessor
+
+CAT_FEATURES = get_preprocessor().transformers[0][2]
+
+def prepare(path, null_fraction, seed = 42):
+    """
+    Lê os dados, injeta nulos nas categóricas e divide em treino e teste
+    """
+    data = load_data(path)
+    rng = np.random.default_rng(seed)
+    for col in CAT_FEATURES:
+        data.loc[rng.random(len(data)) < null_fraction, col] = np.nan
+
+    return split_data(data[FEATURES], data[TARGET])
+
+def fit_and_transform(streaming, path, null_fraction):
+    """
+    Ajusta um pré-processador e retorna tempo, aumento do pico de RSS e a saída no teste
+    """
+    X_train, X_test, y_train, _ = prepare(path, null_fraction)
+    gc.collect()
+
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    preprocessor = get_preprocessor(streaming = streaming).fit(X_train, y_train)
+    elapsed = time.perf_counter() - start
+    growth = peak_rss_mb() - baseline
+
+    # Categorias desconhecidas em parte das linhas do teste
+    unknown = X_test.astype({col: object for col in CAT_FEATURES})
+    unknown.iloc[::7, 0] = 'Desconhecida'
+
+    return elapsed, growth, preprocessor.transform(X_test), preprocessor.transform(unknown)
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser(description = "Paridade e memória do StreamingTargetEncoder")
+    parser.add_argument("--rows", default = "100k", help = "Linhas do dataset sintético (ex.: 100k, 1m)")
+    parser.add_argument("--null-fraction", type = float, default = 0.02)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), f"telco_{args.rows}.csv")
+    generate(parse_size(args.rows), path)
+
+    results = {}
+    for name, streaming in [('TargetEncoder', False), ('Streaming', True)]:
+        with ProcessPoolExecutor(max_workers = 1) as executor:
+            results[name] = executor.submit(fit_and_transform, streaming, path, args.null_fraction).result()
+
+    print(f"{'encoder':<15} {'ajuste (s)':>11} {'pico RSS (MB)':>14}")
+    for name, (elapsed, growth, _, _) in results.items():
+        print(f"{name:<15} {elapsed:>11.2f} {growth:>14.0f}")
+
+    _, _, reference, reference_unknown = results['TargetEncoder']
+    _, _, streamed, streamed_unknown = results['Streaming']
+    diff = max(np.abs(reference - streamed).max(), np.abs(reference_unknown - streamed_unknown).max())
+    print(f"\nDiferença máxima na saída: {diff:.2e}")
+    if diff > 1e-12:
+        sys.exit(1)
@@ -0,0 +1,65 @@
+"""
+Benchmark de pico de memória na preparação dos dados de treino
+
+Compara o caminho em memória (`fit_transform` + DataFrame) com o memmap float32
+de `transform_to_memmap`, até a construção do Pool do CatBoost. Cada caminho
+roda em um processo separado e reporta o aumento do pico de RSS.
+
+Uso: python benchmarks/bench_train_memory.py --rows 1000000
+"""
+import os
+import sys
+import gc
+import time
+import argparse
+import tempfile
+import pandas as pd
+from catboost import Pool
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from scr.utils import load_data, split_data, peak_rss_mb, FEATURES, TARGET
+from scr.data_preprocessing import get_preprocessor
+from scr.train_model import transform_to_memmap
+
+def prepare(mode, path, matrix_path):
+    """
+    Prepara o Pool de treino no modo indicado e retorna tempo e aumento do pico de RSS (MB)
+    """
+    data = load_data(path)
+    X_train, _, y_train, _ = split_data(data[FEATURES], data[TARGET])
+    del data
+    gc.collect()
+
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    preprocessor = get_preprocessor()
+
+    if mode == 'memória':
+        X_train_transformed = pd.DataFrame(preprocessor.fit_transform(X_train, y_train))
+    else:
+        X_train_transformed = transform_to_memmap(preprocessor, X_train, y_train, matrix_path)
+        del X_train
+        gc.collect()
+
+    Pool(X_train_transformed, y_train)
+    return time.perf_counter() - start, peak_rss_mb() - baseline
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser(description = "Benchmark de memória do treino")
+    parser.add_argument("--input", default = "data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv")
+    parser.add_argument("--rows", type = int, default = 1_000_000)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    path = os.path.join(tmp_dir, "telco.csv")
+    raw = pd.read_csv(args.input, dtype = str, keep_default_na = False)
+    pd.concat([raw] * -(-args.rows // len(raw)), ignore_index = True).iloc[:args.rows].to_csv(path, index = False)
+    del raw
+
+    print(f"{'modo':<10} {'tempo (s)':>10} {'pico RSS (+MB)':>15}")
+    for mode in ['memória', 'memmap']:
+        with ProcessPoolExecutor(max_workers = 1) as executor:
+            elapsed, rss = executor.submit(prepare, mode, path, os.path.join(tmp_dir, "X_train.npy")).result()
+        print(f"{mode:<10} {elapsed:>10.2f} {rss:>15.0f}")
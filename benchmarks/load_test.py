@@ -0,0 +1,84 @@
+"""
+Teste de carga do serviço HTTP de pontuação em localhost
+
+Sobe o servidor em uma thread (ou usa `--url` de um servidor já em execução),
+dispara requisições de uma linha a partir de `--concurrency` clientes durante
+`--duration` segundos e reporta throughput, percentis de latência e o
+histograma de tamanhos de lote do servidor.
+
+Uso: python benchmarks/load_test.py --concurrency 16 --duration 10
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import numpy as np
+import pandas as pd
+from urllib.request import Request, urlopen
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from scr.utils import load_model
+from scr.fast_predict import FastScorer
+from scr.server import create_server
+
+def client(url, rows, stop_at, latencies):
+    """
+    Envia requisições sequenciais até `stop_at` e registra a latência de cada uma
+    """
+    i = 0
+    while time.perf_counter() < stop_at:
+        body = json.dumps(rows[i % len(rows)]).encode()
+        request = Request(f"{url}/predict", data = body, headers = {"Content-Type": "application/json"})
+        start = time.perf_counter()
+        with urlopen(request) as response:
+            response.read()
+        latencies.append((time.perf_counter() - start) * 1000)
+        i += 1
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser(description = "Teste de carga do serviço de pontuação")
+    parser.add_argument("--input", default = "data/processed/test.csv")
+    parser.add_argument("--model", default = "models/classifier")
+    parser.add_argument("--url", default = None, help = "Servidor já em execução (padrão: sobe um local)")
+    parser.add_argument("--concurrency", type = int, default = 16)
+    parser.add_argument("--duration", type = float, default = 10.0)
+    parser.add_argument("--max-batch-size", type = int, default = 256)
+    parser.add_argument("--max-wait-ms", type = float, default = 5.0)
+    args = parser.parse_args()
+
+    data = pd.read_csv(args.input).drop(columns = ['Churn'])
+    rows = json.loads(data.to_json(orient = 'records'))
+
+    server = None
+    url = args.url
+    if url is None:
+        model = FastScorer.from_pipeline(load_model(args.model))
+        server = create_server(model, port = 0, max_batch_size = args.max_batch_size, max_wait_ms = args.max_wait_ms)
+        threading.Thread(target = server.serve_forever, daemon = True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    latencies = []
+    stop_at = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target = client, args = (url, rows[i::args.concurrency], stop_at, latencies))
+        for i in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    lat = np.array(latencies)
+    print(f"Requisições: {len(lat)} em {args.duration:.0f}s ({len(lat) / args.duration:,.0f} req/s)")
+    print(f"Latência (ms): p50 {np.percentile(lat, 50):.1f} | p95 {np.percentile(lat, 95):.1f} | p99 {np.percentile(lat, 99):.1f}")
+
+    with urlopen(f"{url}/metrics") as response:
+        metrics = json.loads(response.read())
+    print(f"Tamanho médio de lote: {metrics['batch_size']['mean']:.1f} linhas")
+    print(json.dumps(metrics['batch_size']['buckets'], indent = 2))
+
+    if server is not None:
+        server.shutdown()
@@ -0,0 +1,227 @@
+"""
+Harness de benchmarks dos caminhos críticos do projeto
+
+Para cada tamanho de dataset sintético mede tempo e pico de memória de:
+
+- load: `utils.load_data`
+- preprocess: `get_preprocessor().fit_transform`
+- train: `train_model` (com `--train-iterations` árvores)
+- predict: `make_predictions` com o Pipeline
+- app: caminho do preditor do app (`prepare_input` + FastScorer, uma linha)
+- aggregate: cubo de agregados do relatório e do dashboard (`build_cube`)
+
+Cada estágio roda em um processo separado, para que o pico de RSS de um não
+contamine o outro. Os resultados são gravados em JSON e podem ser comparados
+com uma baseline; a execução termina com código 1 se algum estágio regredir
+além da tolerância.
+
+Uso:
+    python benchmarks/run.py --sizes 10k 1m
+    python benchmarks/run.py --sizes 10k --save-baseline
+    python benchmarks/run.py --sizes 10k --compare
+"""
+import os
+import sys
+import gc
+import json
+import time
+import platform
+import argparse
+import tempfile
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from synthetic import generate, parse_size
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# Variação absoluta mínima para contar como regressão (ruído em estágios muito rápidos)
+MIN_DELTA = {'seconds': 0.05, 'peak_rss_mb': 10.0}
+
+# Cada estágio é um gerador: o código antes do `yield` é a preparação (não medida)
+# e o código depois dele é o trecho medido
+
+def _load(path, workdir, iterations):
+    from scr.utils import load_data
+    yield
+    load_data(path)
+
+def _preprocess(path, workdir, iterations):
+    from scr.utils import load_data, FEATURES, TARGET
+    from scr.data_preprocessing import get_preprocessor
+    data = load_data(path)
+    yield
+    get_preprocessor().fit_transform(data[FEATURES], data[TARGET])
+
+def _train(path, workdir, iterations):
+    import joblib
+    import importlib
+    from scr.utils import load_data, FEATURES, TARGET
+    from scr.data_preprocessing import get_preprocessor
+    from scr.train_model import train_model, class_weights, build_pipeline, DEFAULT_PARAMS
+    # O backend importa o CatBoost só no primeiro treino; a importação fica fora do trecho medido
+    importlib.import_module('catboost')
+    data = load_data(path)
+    preprocessor = get_preprocessor()
+    X = preprocessor.fit_transform(data[FEATURES], data[TARGET])
+    y = data[TARGET]
+    del data
+    gc.collect()
+    yield
+    # Hiperparâmetros fixos: o resultado não depende de um models/best_params.json local
+    model = train_model(X, y, class_weights(y), {**DEFAULT_PARAMS, 'iterations': iterations})
+    joblib.dump(build_pipeline(model, preprocessor), os.path.join(workdir, "model.pkl"))
+
+def _predict(path, workdir, iterations):
+    from scr.utils import load_data, load_model, FEATURES
+    from scr.predict import make_predictions
+    model = load_model(os.path.join(workdir, "model.pkl"))
+    data = load_data(path)[FEATURES]
+    yield
+    make_predictions(model, data)
+
+def _app(path, workdir, iterations):
+    import pandas as pd
+    from scr.utils import load_model, FEATURES
+    from scr.labels import prepare_input
+    from scr.fast_predict import FastScorer
+    scorer = FastScorer.from_pipeline(load_model(os.path.join(workdir, "model.pkl")))
+    rows = [row.to_frame().T for _, row in pd.read_csv(path, nrows = 200)[FEATURES].iterrows()]
+    yield
+    for row in rows:
+        scorer.predict_proba(prepare_input(row)[0])
+
+def _aggregate(path, workdir, iterations):
+    from scr.aggregates import build_cube
+    yield
+    build_cube(path)
+
+STAGES = {
+    'load': _load,
+    'preprocess': _preprocess,
+    'train': _train,
+    'predict': _predict,
+    'app': _app,
+    'aggregate': _aggregate
+}
+
+def run_stage(name, path, workdir, iterations):
+    """
+    Executa a preparação do estágio, depois mede o tempo e o aumento do pico de RSS da parte medida
+    """
+    from scr.utils import peak_rss_mb
+
+    stage = STAGES[name](path, workdir, iterations)
+    next(stage)
+    baseline = peak_rss_mb() or 0.0
+    start = time.perf_counter()
+    next(stage, None)
+    elapsed = time.perf_counter() - start
+
+    return {'seconds': elapsed, 'peak_rss_mb': (peak_rss_mb() or 0.0) - baseline}
+
+def run(sizes, stages, iterations, data_dir):
+    """
+    Executa todos os estágios para cada tamanho e retorna a lista de resultados
+    """
+    results = []
+    for size in sizes:
+        n_rows = parse_size(size)
+        path = os.path.join(data_dir, f"telco_{size}.csv")
+        if not os.path.exists(path):
+            generate(n_rows, path)
+
+        workdir = tempfile.mkdtemp()
+        for name in stages:
+            with ProcessPoolExecutor(max_workers = 1) as executor:
+                measured = executor.submit(run_stage, name, path, workdir, iterations).result()
+
+            rows = 200 if name == 'app' else n_rows
+            result = {'size': size, 'stage': name, 'rows': rows, **measured,
+                      'rows_per_s': rows / max(measured['seconds'], 1e-9)}
+            results.append(result)
+            print(f"{size:>6} {name:<11} {measured['seconds']:>9.2f}s {measured['peak_rss_mb']:>9.0f} MB "
+                  f"{result['rows_per_s']:>14,.0f} linhas/s")
+
+    return results
+
+def compare(results, baseline, tolerance):
+    """
+    Compara com a baseline e retorna a lista de regressões acima da tolerância
+
+    Tempos só são comparáveis com o mesmo número de núcleos (treino, predição e
+    leitura usam várias threads); com outro número, só a memória é comparada.
+    Estágios sem entrada na baseline são listados, não ignorados em silêncio.
+    """
+    reference = {(r['size'], r['stage']): r for r in baseline['results']}
+    regressions = []
+    missing = []
+
+    metrics = MIN_DELTA
+    if baseline['meta']['cpu_count'] != os.cpu_count():
+        metrics = {'peak_rss_mb': MIN_DELTA['peak_rss_mb']}
+        print(f"\nBaseline gravada com {baseline['meta']['cpu_count']} núcleo(s) e esta máquina tem "
+              f"{os.cpu_count()}: tempos não comparados (regrave com --save-baseline)")
+
+    for result in results:
+        base = reference.get((result['size'], result['stage']))
+        if base is None:
+            missing.append(f"{result['size']}/{result['stage']}")
+            continue
+        for metric, min_delta in metrics.items():
+            delta = result[metric] - base[metric]
+            if result[metric] > base[metric] * (1 + tolerance) and delta > min_delta:
+                regressions.append(
+                    f"{result['size']}/{result['stage']}: {metric} {base[metric]:.2f} -> {result[metric]:.2f}"
+                )
+
+    if missing:
+        print(f"\nSem baseline (não comparados): {', '.join(missing)}; regrave com --save-baseline")
+
+    return regressions
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser(description = "Benchmarks dos caminhos críticos")
+    parser.add_argument("--sizes", nargs = "+", default = ["10k"], help = "Tamanhos dos datasets (ex.: 10k 1m 10m)")
+    parser.add_argument("--stages", nargs = "+", default = list(STAGES), choices = list(STAGES))
+    parser.add_argument("--train-iterations", type = int, default = 100)
+    parser.add_argument("--data-dir", default = "data/synthetic")
+    parser.add_argument("--compare", action = "store_true", help = "Compara com benchmarks/baseline.json")
+    parser.add_argument("--tolerance", type = float, default = 0.20, help = "Regressão relativa tolerada")
+    parser.add_argument("--save-baseline", action = "store_true")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.stages, args.train_iterations, args.data_dir)
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec = 'seconds'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'train_iterations': args.train_iterations
+        },
+        'results': results
+    }
+
+    os.makedirs(RESULTS_DIR, exist_ok = True)
+    output = os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent = 2)
+    print(f"\nResultados salvos em {output}")
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump(report, f, indent = 2)
+        print(f"Baseline atualizada em {BASELINE_PATH}")
+
+    if args.compare:
+        with open(BASELINE_PATH) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressões detectadas:")
+            print("\n".join(regressions))
+            sys.exit(1)
+        print("\nSem regressões em relação à baseline.")
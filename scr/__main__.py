@@ -0,0 +1,44 @@
+"""
+Linha de comando única do projeto
+
+    python -m scr <subcomando> [opções]
+
+Cada subcomando importa apenas o seu módulo, então `predict` não carrega o
+sklearn, o category_encoders nem o feature_engine, e `--help` não carrega nada.
+"""
+import sys
+from importlib import import_module
+
+# Subcomando -> (módulo em scr/, descrição)
+COMMANDS = {
+    'train': ('train_model', "Treina o modelo e salva o bundle"),
+    'evaluate': ('evaluate_model', "Validação cruzada e métricas no conjunto de teste"),
+    'predict': ('predict', "Pontua um arquivo .csv ou .parquet em lotes"),
+    'compare': ('compare', "Compara CatBoost, LightGBM e XGBoost em latência, tamanho e métricas"),
+    'tune': ('tune', "Busca de hiperparâmetros com successive halving"),
+    'threshold': ('threshold', "Escolhe e salva o limiar de decisão (F1, MCC, custo da campanha)"),
+    'retrain': ('retrain', "Retreino incremental com novos dados"),
+    'serve': ('server', "Serviço HTTP local de pontuação")
+}
+
+def usage():
+    lines = ["uso: python -m scr <subcomando> [opções]", "", "subcomandos:"]
+    lines += [f"  {name:<10} {description}" for name, (_, description) in COMMANDS.items()]
+    return "\n".join(lines)
+
+def main(argv = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        return 0
+    if argv[0] not in COMMANDS:
+        print(f"Subcomando desconhecido: {argv[0]}\n\n{usage()}", file = sys.stderr)
+        return 2
+
+    module = import_module(f".{COMMANDS[argv[0]][0]}", __package__)
+    sys.argv[0] = f"python -m scr {argv[0]}"
+    module.main(argv[1:])
+    return 0
+
+if __name__=="__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""
+Cubo de agregados de churn para o relatório e o dashboard do app
+
+Em vez de agrupar o DataFrame completo e passar todas as linhas ao Plotly, o
+app lê um cubo compacto com, para cada combinação de Churn x dimensões
+categóricas, a contagem de clientes e as somas usadas nos KPIs, além de
+histogramas pré-binados das numéricas. O tamanho do cubo não depende do número
+de linhas (2 x 4 x 4 x 5 células e algumas dezenas de bins).
+
+Os bins são fixos, então cubos de arquivos ou blocos diferentes podem ser
+somados: `ChurnCube.update` acumula um bloco novo e `+` combina dois cubos, o
+que permite atualizar os agregados só com os dados que chegaram.
+"""
+import os
+import numpy as np
+import pandas as pd
+from .utils import TELCO_SCHEMA, YES_NO
+
+# Dimensões categóricas do cubo (a última posição de cada eixo guarda valores nulos ou desconhecidos)
+DIMENSIONS = ['InternetService', 'Contract', 'PaymentMethod']
+
+# Bordas fixas dos histogramas; valores fora do intervalo vão para o primeiro/último bin
+BINS = {
+    'tenure': np.arange(0, 74, 1),
+    'MonthlyCharges': np.arange(0, 152, 2)
+}
+
+COLUMNS = ['Churn'] + DIMENSIONS + ['tenure', 'MonthlyCharges', 'TotalCharges']
+CHURN_LABELS = YES_NO.categories.tolist()
+
+def _categories(dimension):
+    return TELCO_SCHEMA[dimension].categories.tolist()
+
+class ChurnCube:
+    """
+    Contagens e somas por Churn x dimensões e histogramas por Churn
+
+    `counts`, `tenure_sum`, `charges_sum` e `charges_count` têm formato
+    (2, *dimensões + 1); cada histograma tem formato (2, bins).
+    """
+    def __init__(self):
+        self.shape = (len(CHURN_LABELS), *[len(_categories(dim)) + 1 for dim in DIMENSIONS])
+        self.counts = np.zeros(self.shape, dtype = np.int64)
+        self.tenure_sum = np.zeros(self.shape, dtype = np.float64)
+        self.charges_sum = np.zeros(self.shape, dtype = np.float64)
+        self.charges_count = np.zeros(self.shape, dtype = np.int64)
+        self.histograms = {name: np.zeros((len(CHURN_LABELS), len(edges) - 1), dtype = np.int64)
+                           for name, edges in BINS.items()}
+        self.tenure_max = 0
+
+    def update(self, chunk):
+        """
+        Acumula um bloco de linhas (dados brutos ou tratados por `load_data`)
+
+        Linhas sem Churn são ignoradas.
+        """
+        churn = chunk['Churn']
+        if not pd.api.types.is_numeric_dtype(churn):
+            churn = churn.astype(YES_NO).cat.codes
+        churn = churn.to_numpy(dtype = np.int64)
+        valid = churn >= 0
+        churn = churn[valid]
+
+        axes = [churn]
+        for dim in DIMENSIONS:
+            codes = chunk[dim].astype(TELCO_SCHEMA[dim]).cat.codes.to_numpy(dtype = np.int64)[valid]
+            axes.append(np.where(codes < 0, len(_categories(dim)), codes))
+        cells = np.ravel_multi_index(axes, self.shape)
+        size = self.counts.size
+
+        tenure = pd.to_numeric(chunk['tenure'], errors = 'coerce').to_numpy(dtype = np.float64)[valid]
+        charges = pd.to_numeric(chunk['TotalCharges'], errors = 'coerce').to_numpy(dtype = np.float64)[valid]
+        has_charges = ~np.isnan(charges)
+
+        self.counts += np.bincount(cells, minlength = size).reshape(self.shape)
+        self.tenure_sum += np.bincount(cells, np.nan_to_num(tenure), minlength = size).reshape(self.shape)
+        self.charges_sum += np.bincount(cells[has_charges], charges[has_charges], minlength = size).reshape(self.shape)
+        self.charges_count += np.bincount(cells[has_charges], minlength = size).reshape(self.shape)
+        if len(tenure) and not np.isnan(tenure).all():
+            self.tenure_max = max(self.tenure_max, int(np.nanmax(tenure)))
+
+        for name, edges in BINS.items():
+            values = pd.to_numeric(chunk[name], errors = 'coerce').to_numpy(dtype = np.float64)[valid]
+            present = ~np.isnan(values)
+            bins = np.clip(np.searchsorted(edges, values[present], side = 'right') - 1, 0, len(edges) - 2)
+            n_bins = len(edges) - 1
+            self.histograms[name] += np.bincount(churn[present] * n_bins + bins,
+                                                 minlength = 2 * n_bins).reshape(2, n_bins)
+
+        return self
+
+    def __add__(self, other):
+        cube = ChurnCube()
+        for attr in ['counts', 'tenure_sum', 'charges_sum', 'charges_count']:
+            setattr(cube, attr, getattr(self, attr) + getattr(other, attr))
+        cube.histograms = {name: self.histograms[name] + other.histograms[name] for name in BINS}
+        cube.tenure_max = max(self.tenure_max, other.tenure_max)
+
+        return cube
+
+    @property
+    def rows(self):
+        return int(self.counts.sum())
+
+    def table(self, dimension, churned_only = False, name = 'Contagem'):
+        """
+        Contagem por Churn x `dimension`, no formato de `groupby(['Churn', dimension]).count()`
+        """
+        axis = 1 + DIMENSIONS.index(dimension)
+        other = tuple(i for i in range(1, len(self.shape)) if i != axis)
+        counts = self.counts.sum(axis = other)[:, :-1]
+
+        churn, category = np.nonzero(counts)
+        table = pd.DataFrame({
+            'Churn': np.asarray(CHURN_LABELS)[churn],
+            dimension: np.asarray(_categories(dimension), dtype = object)[category],
+            name: counts[churn, category]
+        })
+
+        return table[table['Churn'] == 'Yes'].reset_index(drop = True) if churned_only else table
+
+    def churn_share(self):
+        """
+        Proporção (%) de cada classe de Churn, da maior para a menor
+        """
+        counts = self.counts.reshape(len(CHURN_LABELS), -1).sum(axis = 1)
+        share = pd.DataFrame({'Churn': CHURN_LABELS, 'proportion': (counts / max(counts.sum(), 1) * 100).round(2)})
+
+        return share.sort_values('proportion', ascending = False, kind = 'stable').reset_index(drop = True)
+
+    def histogram(self, name):
+        """
+        Contagem por bin e Churn, sem os bins vazios das pontas
+
+        `bin` é o centro do bin e `bin_start`/`bin_end` as suas bordas.
+        """
+        edges, counts = BINS[name], self.histograms[name]
+        used = np.flatnonzero(counts.sum(axis = 0))
+        first, last = (used[0], used[-1] + 1) if len(used) else (0, 0)
+
+        frames = []
+        for i, label in enumerate(CHURN_LABELS):
+            frames.append(pd.DataFrame({
+                'Churn': label,
+                'bin': (edges[first:last] + edges[first + 1:last + 1]) / 2,
+                'bin_start': edges[first:last],
+                'bin_end': edges[first + 1:last + 1],
+                'count': counts[i, first:last]
+            }))
+
+        return pd.concat(frames, ignore_index = True)
+
+    def kpis(self):
+        """
+        Total de clientes, taxa de churn (%), TotalCharges médio e tenure médio
+        """
+        rows = max(self.rows, 1)
+        return {
+            'clientes': self.rows,
+            'churn': self.counts[1].sum() / rows * 100,
+            'ltv': self.charges_sum.sum() / max(self.charges_count.sum(), 1),
+            'tenure': self.tenure_sum.sum() / rows
+        }
+
+    def options(self, dimension):
+        """
+        Categorias observadas de `dimension` (ordem do esquema) e o índice da mais frequente
+        """
+        counts = self.table(dimension).groupby(dimension, sort = False)['Contagem'].sum()
+        categories = [cat for cat in _categories(dimension) if cat in counts.index]
+
+        return categories, categories.index(counts.idxmax()) if categories else 0
+
+    def save(self, path):
+        """
+        Grava o cubo em .npz de forma atômica
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f, counts = self.counts, tenure_sum = self.tenure_sum, charges_sum = self.charges_sum,
+                charges_count = self.charges_count, tenure_max = self.tenure_max,
+                **{f'hist_{name}': hist for name, hist in self.histograms.items()}
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        cube = cls()
+        with np.load(path) as data:
+            for attr in ['counts', 'tenure_sum', 'charges_sum', 'charges_count']:
+                setattr(cube, attr, data[attr])
+            cube.histograms = {name: data[f'hist_{name}'] for name in BINS}
+            cube.tenure_max = int(data['tenure_max'])
+
+        return cube
+
+def build_cube(path, chunksize = 500_000):
+    """
+    Monta o cubo de um arquivo .csv ou .parquet lendo só as colunas necessárias, em blocos
+    """
+    cube = ChurnCube()
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size = chunksize, columns = COLUMNS):
+            cube.update(batch.to_pandas())
+        return cube
+
+    dtypes = {col: TELCO_SCHEMA[col] for col in COLUMNS if col not in ('tenure', 'TotalCharges')}
+    chunks = pd.read_csv(path, usecols = COLUMNS, dtype = dtypes, na_values = {'TotalCharges': [' ']},
+                         chunksize = chunksize)
+    for chunk in chunks:
+        cube.update(chunk)
+
+    return cube
@@ -0,0 +1,235 @@
+"""
+Formato de artefato do modelo (bundle) em diretório
+
+    models/classifier/
+    ├── manifest.json      # versão do formato, hash do esquema das features, arquivos, limiar
+    ├── tables.json        # tabelas congeladas do pré-processador (export_tables)
+    ├── model.cbm          # modelo no formato nativo do backend (.cbm do CatBoost, .ubj do XGBoost, .txt do LightGBM)
+    ├── preprocessor.joblib  # pré-processador sklearn, usado apenas no retreino/avaliação
+    └── reference.json     # resumo das features do treino para o monitoramento de drift (opcional)
+
+Para pontuar bastam o manifesto, as tabelas e o modelo: nada do sklearn é
+desserializado. O modelo só é lido na primeira predição e o pré-processador
+apenas quando o Pipeline completo é pedido (`ModelBundle.pipeline`).
+"""
+import os
+import json
+import shutil
+import hashlib
+import threading
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from .utils import TELCO_SCHEMA, FEATURES
+from .fast_predict import FastScorer, export_tables
+from .threshold import DEFAULT_THRESHOLD
+from .backends import get_backend
+
+FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+TABLES_FILE = "tables.json"
+PREPROCESSOR_FILE = "preprocessor.joblib"
+REFERENCE_FILE = "reference.json"
+
+def _dtype_spec(dtype):
+    # str() de um CategoricalDtype é só 'category': as categorias entram explicitamente
+    if isinstance(dtype, pd.CategoricalDtype):
+        return {'categories': [str(value) for value in dtype.categories], 'ordered': bool(dtype.ordered)}
+    return str(dtype)
+
+def schema_hash(features = FEATURES):
+    """
+    Hash das features esperadas pelo modelo: nomes, ordem, tipos e categorias permitidas do esquema
+    """
+    schema = [[col, _dtype_spec(TELCO_SCHEMA[col])] for col in features]
+    return hashlib.sha256(json.dumps(schema).encode()).hexdigest()[:16]
+
+def _tables_to_json(tables):
+    return {
+        'cat_features': list(tables['cat_features']),
+        'num_features': list(tables['num_features']),
+        'fill_values': {col: str(value) for col, value in tables['fill_values'].items()},
+        'categories': {col: [str(v) for v in values] for col, values in tables['categories'].items()},
+        'encodings': {col: values.tolist() for col, values in tables['encodings'].items()},
+        'unknown': tables['unknown'],
+        'medians': tables['medians'].tolist()
+    }
+
+def _tables_from_json(data):
+    return {
+        **data,
+        'categories': {col: np.asarray(values, dtype = object) for col, values in data['categories'].items()},
+        'encodings': {col: np.asarray(values, dtype = np.float64) for col, values in data['encodings'].items()},
+        'medians': np.asarray(data['medians'], dtype = np.float64)
+    }
+
+def save_bundle(pipeline, path, reference = None):
+    """
+    Grava o Pipeline treinado como bundle em `path`
+
+    `reference` (de `monitoring.build_reference`) é gravada junto para o
+    monitoramento de drift na pontuação.
+
+    Os arquivos são escritos em um diretório temporário que substitui o bundle
+    anterior apenas no final, então uma falha não deixa um bundle pela metade.
+    """
+    import joblib
+
+    # Sem a barra final, "models/classifier/" viraria "models/classifier/.tmp"
+    path = os.path.normpath(path)
+    tmp_path = f"{path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors = True)
+    os.makedirs(tmp_path)
+
+    model = pipeline.named_steps['model']
+    backend = get_backend(model)
+    backend.save(model, os.path.join(tmp_path, backend.model_file))
+    joblib.dump(pipeline.named_steps['preprocessor'], os.path.join(tmp_path, PREPROCESSOR_FILE))
+    with open(os.path.join(tmp_path, TABLES_FILE), 'w') as f:
+        json.dump(_tables_to_json(export_tables(pipeline)), f)
+    files = [backend.model_file, *backend.extra_files, TABLES_FILE, PREPROCESSOR_FILE]
+    if reference is not None:
+        with open(os.path.join(tmp_path, REFERENCE_FILE), 'w') as f:
+            json.dump(reference, f)
+        files.append(REFERENCE_FILE)
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'created': datetime.now().isoformat(timespec = 'seconds'),
+        'features': FEATURES,
+        'schema_hash': schema_hash(),
+        'backend': backend.name,
+        'model_class': type(model).__name__,
+        'files': files
+    }
+    with open(os.path.join(tmp_path, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent = 2)
+
+    old_path = f"{path}.old"
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors = True)
+
+    return path
+
+def read_manifest(path):
+    with open(os.path.join(path, MANIFEST_FILE)) as f:
+        return json.load(f)
+
+def read_threshold(path):
+    """
+    Limiar de decisão salvo no bundle, ou o padrão (também para modelos .pkl)
+    """
+    if not os.path.isdir(path):
+        return DEFAULT_THRESHOLD
+    return read_manifest(path).get('threshold', {}).get('threshold', DEFAULT_THRESHOLD)
+
+def set_threshold(path, threshold, details = None):
+    """
+    Grava o limiar de decisão (e como ele foi escolhido) no manifesto do bundle
+    """
+    manifest = read_manifest(path)
+    manifest['threshold'] = {'threshold': threshold, **(details or {})}
+
+    tmp_path = os.path.join(path, f"{MANIFEST_FILE}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent = 2)
+    os.replace(tmp_path, os.path.join(path, MANIFEST_FILE))
+
+def model_version(path):
+    """
+    Hash do conteúdo do modelo: o arquivo do modelo e as tabelas de um bundle, ou o arquivo .pkl
+
+    Não inclui o manifesto, então mudar o limiar não muda a versão.
+    """
+    files = [path]
+    if os.path.isdir(path):
+        model_file = get_backend(read_manifest(path).get('backend', 'catboost')).model_file
+        files = [os.path.join(path, name) for name in (model_file, TABLES_FILE)]
+
+    digest = hashlib.sha256()
+    for name in files:
+        with open(name, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+
+    return digest.hexdigest()[:16]
+
+def model_lineage(path):
+    """
+    Identificador do modelo em `path`, estável entre retreinos (ao contrário de `model_version`)
+    """
+    return hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:12]
+
+def read_reference(path):
+    """
+    Referência do monitoramento de drift salva no bundle, ou None (bundles antigos e modelos .pkl)
+    """
+    reference_path = os.path.join(path, REFERENCE_FILE)
+    if not os.path.exists(reference_path):
+        return None
+    with open(reference_path) as f:
+        return json.load(f)
+
+class ModelBundle(FastScorer):
+    """
+    Modelo carregado de um bundle: um FastScorer cujo modelo é lido sob demanda
+
+    Na abertura são lidos apenas o manifesto e as tabelas (alguns KB). O modelo
+    é carregado na primeira predição e o Pipeline sklearn só quando acessado.
+    Bundles anteriores ao campo `backend` são do CatBoost.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._model = None
+        self._pipeline = None
+        self._lock = threading.Lock()
+
+        self.manifest = read_manifest(path)
+        if self.manifest['format_version'] != FORMAT_VERSION:
+            raise ValueError(f"Versão de bundle não suportada: {self.manifest['format_version']}")
+        if self.manifest['schema_hash'] != schema_hash():
+            raise ValueError(
+                f"O esquema das features mudou desde o treino do modelo em {path}; treine o modelo novamente"
+            )
+
+        with open(os.path.join(path, TABLES_FILE)) as f:
+            tables = _tables_from_json(json.load(f))
+        super().__init__(tables, None)
+
+    @property
+    def threshold(self):
+        return self.manifest.get('threshold', {}).get('threshold', DEFAULT_THRESHOLD)
+
+    @property
+    def reference(self):
+        return read_reference(self.path)
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    backend = get_backend(self.manifest.get('backend', 'catboost'))
+                    self._model = backend.load(os.path.join(self.path, backend.model_file))
+        return self._model
+
+    @model.setter
+    def model(self, value):
+        self._model = value
+
+    @property
+    def pipeline(self):
+        """
+        Pipeline sklearn completo (pré-processador + modelo), para retreino e validação cruzada
+        """
+        if self._pipeline is None:
+            import joblib
+            from sklearn.pipeline import Pipeline
+            preprocessor = joblib.load(os.path.join(self.path, PREPROCESSOR_FILE))
+            self._pipeline = Pipeline([('preprocessor', preprocessor), ('model', self.model)])
+        return self._pipeline
+
+def load_bundle(path):
+    return ModelBundle(path)
@@ -0,0 +1,131 @@
+"""
+Comparação dos backends de modelo (CatBoost, LightGBM, XGBoost)
+
+Ajusta o pré-processador uma única vez e treina cada backend na mesma matriz.
+Cada modelo é gravado como bundle e pontuado como em produção (tabelas
+congeladas + modelo). Para cada backend são reportados:
+
+- tempo de treino, tamanho do arquivo do modelo e tempo de carga;
+- latência de uma linha (p50/p99, como no app e no serviço HTTP) e de um lote;
+- as métricas de `evaluation` no conjunto de teste, no mesmo limiar.
+
+Todos os backends treinam com os hiperparâmetros padrão da própria biblioteca:
+a busca do tune.py só cobre o CatBoost, e usá-la só nele compararia um modelo
+ajustado com dois sem ajuste.
+
+Com `--slo-ms`, indica quais backends atendem ao SLO de latência por linha.
+"""
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+from .utils import FEATURES, TARGET
+from .dataset_store import load_splits
+from .data_preprocessing import get_preprocessor
+from .train_model import train_model, class_weights, build_pipeline
+from .backends import BACKENDS
+from .bundle import save_bundle, load_bundle
+from .evaluate_model import evaluation
+from .threshold import DEFAULT_THRESHOLD
+
+def latency(scorer, X, n_rows = 1_000, batch_size = 10_000, repeats = 3):
+    """
+    Latência por linha (p50 e p99 em ms, uma chamada por cliente) e de um lote de `batch_size` linhas
+    """
+    rows = X.iloc[:n_rows].to_dict(orient = 'records')
+    timings = []
+    for row in rows:
+        start = time.perf_counter()
+        scorer.predict_proba(row)
+        timings.append(time.perf_counter() - start)
+
+    batch = X.iloc[np.arange(batch_size) % len(X)]
+    batch_s = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        scorer.predict_proba(batch)
+        batch_s.append(time.perf_counter() - start)
+
+    return {
+        'linha p50 (ms)': np.percentile(timings, 50) * 1000,
+        'linha p99 (ms)': np.percentile(timings, 99) * 1000,
+        'lote (ms)': min(batch_s) * 1000,
+        'lote (linhas/s)': batch_size / min(batch_s)
+    }
+
+def compare_backends(backends, X_train, y_train, X_test, y_test, workdir, threshold = DEFAULT_THRESHOLD,
+                     n_rows = 1_000, batch_size = 10_000):
+    """
+    Treina, grava, carrega, mede e avalia cada backend; retorna um DataFrame (métrica x backend)
+
+    Os modelos usam os hiperparâmetros padrão de cada biblioteca.
+    """
+    preprocessor = get_preprocessor()
+    X_train_transformed = preprocessor.fit_transform(X_train, y_train)
+    weights = class_weights(y_train)
+
+    results = {}
+    for name in backends:
+        start = time.perf_counter()
+        model = train_model(X_train_transformed, y_train, weights, {}, name)
+        train_s = time.perf_counter() - start
+
+        path = save_bundle(build_pipeline(model, preprocessor), os.path.join(workdir, name))
+        size_mb = os.path.getsize(os.path.join(path, BACKENDS[name].model_file)) / 1024 ** 2
+
+        # A carga do modelo acontece na primeira predição do bundle
+        start = time.perf_counter()
+        scorer = load_bundle(path)
+        scorer.predict_proba(X_test.iloc[:1])
+        load_s = time.perf_counter() - start
+
+        results[name] = {
+            'treino (s)': train_s,
+            'tamanho (MB)': size_mb,
+            'carga (s)': load_s,
+            **latency(scorer, X_test, n_rows, batch_size),
+            **evaluation(scorer, X_test, y_test, threshold)
+        }
+
+    return pd.DataFrame(results)
+
+def main(argv = None):
+    """
+    Ponto de entrada do subcomando `compare` (python -m scr compare)
+    """
+    parser = argparse.ArgumentParser(description = "Compara CatBoost, LightGBM e XGBoost em velocidade e qualidade")
+    parser.add_argument("--data", default = "data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv")
+    parser.add_argument("--backends", nargs = "+", choices = list(BACKENDS), default = list(BACKENDS))
+    parser.add_argument("--rows", type = int, default = 1_000, help = "Chamadas de uma linha na medição de latência")
+    parser.add_argument("--batch-size", type = int, default = 10_000, help = "Linhas do lote na medição de latência")
+    parser.add_argument("--slo-ms", type = float, default = None, help = "SLO de latência p99 por linha, em ms")
+    parser.add_argument("--output", default = None, help = "Grava a comparação em .csv")
+    args = parser.parse_args(argv)
+
+    X_train, X_test, y_train, y_test = load_splits(args.data, FEATURES, TARGET)
+
+    workdir = tempfile.mkdtemp()
+    try:
+        report = compare_backends(args.backends, X_train, y_train, X_test, y_test, workdir,
+                                  n_rows = args.rows, batch_size = args.batch_size)
+    finally:
+        shutil.rmtree(workdir, ignore_errors = True)
+
+    print(f"\nComparação dos backends (hiperparâmetros padrão das bibliotecas, limiar {DEFAULT_THRESHOLD:.2f}, "
+          f"{len(X_test)} linhas de teste)")
+    print(f"{'-' * 25}")
+    print(report.round(4).to_string())
+
+    if args.slo_ms is not None:
+        within = report.columns[report.loc['linha p99 (ms)'] <= args.slo_ms]
+        print(f"\nDentro do SLO de {args.slo_ms:.1f} ms por linha (p99): {', '.join(within) or 'nenhum'}")
+        if len(within):
+            best = report.loc['ROC AUC', within].idxmax()
+            print(f"Maior ROC AUC dentro do SLO: {best}")
+
+    if args.output:
+        report.to_csv(args.output)
+        print(f'\nComparação salva em "{args.output}"')
@@ -1,16 +1,131 @@
 import numpy as np
 import pandas as pd
+from scipy.special import expit
+from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.pipeline import Pipeline
 from sklearn.compose import ColumnTransformer
 from feature_engine.imputation import MeanMedianImputer, CategoricalImputer
 from category_encoders import TargetEncoder
 
-def get_preprocessor():
+class StreamingTargetEncoder(BaseEstimator, TransformerMixin):
+    """
+    Imputação pela moda e Target Encoding ajustados em uma única passada por blocos
+
+    Substitui o par `CategoricalImputer(imputation_method = 'frequent')` +
+    `TargetEncoder()` com o mesmo resultado: no ajuste acumula, por coluna, a
+    contagem e a soma do alvo de cada categoria (e das linhas nulas), então a
+    memória depende da cardinalidade das categorias e não do número de linhas.
+    `partial_fit` permite ajustar a partir de blocos lidos de um arquivo.
+
+    Como no par original, as linhas nulas entram nas estatísticas da moda, a
+    suavização é `prior * (1 - w) + média * w` com `w = expit((n - min_samples_leaf) / smoothing)`
+    e categorias desconhecidas recebem a média global do alvo.
+    """
+    def __init__(self, min_samples_leaf = 20, smoothing = 10, chunksize = 100_000):
+        self.min_samples_leaf = min_samples_leaf
+        self.smoothing = smoothing
+        self.chunksize = chunksize
+
+    def _reset(self, X):
+        self.feature_names_in_ = np.asarray(X.columns, dtype = object)
+        self.n_features_in_ = X.shape[1]
+        self.stats_ = {col: {} for col in X.columns}
+        self.missing_ = {col: [0, 0.0] for col in X.columns}
+        self.n_rows_, self.target_sum_ = 0, 0.0
+
+    def fit(self, X, y):
+        self._reset(X)
+        y = np.asarray(y)
+        for start in range(0, len(X), self.chunksize):
+            self.partial_fit(X.iloc[start:start + self.chunksize], y[start:start + self.chunksize])
+
+        return self
+
+    def partial_fit(self, X, y):
+        """
+        Acumula as contagens e somas do alvo de um bloco
+        """
+        if not hasattr(self, 'stats_'):
+            self._reset(X)
+
+        y = np.asarray(y, dtype = np.float64)
+        for col in self.feature_names_in_:
+            codes, uniques = pd.factorize(X[col])
+            counts = np.bincount(codes + 1, minlength = len(uniques) + 1)
+            sums = np.bincount(codes + 1, weights = y, minlength = len(uniques) + 1)
+
+            stats = self.stats_[col]
+            for value, n, total in zip(uniques, counts[1:], sums[1:]):
+                current = stats.setdefault(value, [0, 0.0])
+                current[0] += int(n)
+                current[1] += total
+            self.missing_[col][0] += int(counts[0])
+            self.missing_[col][1] += sums[0]
+
+        self.n_rows_ += len(y)
+        self.target_sum_ += y.sum()
+        self._tables = None
+
+        return self
+
+    def lookup_tables(self):
+        """
+        Valores de imputação, categorias, encodings e valor para categorias desconhecidas
+        """
+        if getattr(self, '_tables', None) is not None:
+            return self._tables
+
+        prior = self.target_sum_ / self.n_rows_
+        fill_values, categories, encodings = {}, {}, {}
+        for col in self.feature_names_in_:
+            values = list(self.stats_[col])
+            counts = np.array([self.stats_[col][v][0] for v in values], dtype = np.int64)
+            sums = np.array([self.stats_[col][v][1] for v in values], dtype = np.float64)
+
+            mode = int(np.argmax(counts))
+            if (counts == counts[mode]).sum() > 1:
+                raise ValueError(f"A variável {col} tem mais de uma categoria mais frequente.")
+            counts[mode] += self.missing_[col][0]
+            sums[mode] += self.missing_[col][1]
+
+            weight = expit((counts - self.min_samples_leaf) / self.smoothing)
+            fill_values[col] = values[mode]
+            categories[col] = np.asarray(values, dtype = object)
+            encodings[col] = prior * (1 - weight) + (sums / counts) * weight
+
+        self._tables = {
+            'fill_values': fill_values,
+            'categories': categories,
+            'encodings': encodings,
+            'unknown': {col: float(prior) for col in self.feature_names_in_}
+        }
+        return self._tables
+
+    def transform(self, X):
+        tables = self.lookup_tables()
+        encoded = np.empty((len(X), len(self.feature_names_in_)), dtype = np.float64)
+
+        for j, col in enumerate(self.feature_names_in_):
+            categories = tables['categories'][col]
+            codes = pd.Categorical(X[col], categories = categories).codes.astype(np.intp)
+            codes[codes == -1] = len(categories)
+            codes[X[col].isna().to_numpy()] = list(categories).index(tables['fill_values'][col])
+            encoded[:, j] = np.append(tables['encodings'][col], tables['unknown'][col])[codes]
+
+        return pd.DataFrame(encoded, index = X.index, columns = self.feature_names_in_)
+
+    def get_feature_names_out(self, input_features = None):
+        return np.asarray(self.feature_names_in_, dtype = object)
+
+def get_preprocessor(streaming = False):
     """
     Retorna um pré-processador para transformar variáveis categóricas e numéricas
 
     - Variáveis categóricas: Imputação pelo valor mais frequente e encoding por Target Encoding
     - Variáveis numéricas: Imputação pela mediana
+
+    Com `streaming = True` as categóricas usam o `StreamingTargetEncoder`, com o
+    mesmo resultado e memória de ajuste proporcional à cardinalidade.
     """
     cat_features = [
         'gender', 'SeniorCitizen', 'Partner', 'Dependents', 'PhoneService', 
@@ -21,10 +136,15 @@ def get_preprocessor():
     num_features = ['tenure', 'MonthlyCharges', 'TotalCharges']
 
     # Pipeline para variáveis categóricas
-    cat_transformer = Pipeline([
-        ('cat_imput', CategoricalImputer(imputation_method = 'frequent')),
-        ('cat_encoding', TargetEncoder())
-    ])
+    if streaming:
+        cat_transformer = Pipeline([
+            ('cat_encoding', StreamingTargetEncoder())
+        ])
+    else:
+        cat_transformer = Pipeline([
+            ('cat_imput', CategoricalImputer(imputation_method = 'frequent')),
+            ('cat_encoding', TargetEncoder())
+        ])
 
     # Pipeline para variáveis numéricas
     num_transformer = Pipeline([
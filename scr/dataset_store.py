@@ -0,0 +1,137 @@
+import os
+import json
+import hashlib
+import inspect
+import pandas as pd
+from . import utils
+
+CACHE_DIR = "data/cache"
+
+def cleaning_version():
+    """
+    Hash do código de limpeza (fonte de `load_data` e esquema declarado)
+    """
+    source = inspect.getsource(utils.load_data) + repr(utils.TELCO_SCHEMA)
+    return hashlib.sha256(source.encode()).hexdigest()[:16]
+
+def file_hash(path, cache_dir = CACHE_DIR):
+    """
+    Hash SHA-256 do conteúdo do arquivo
+
+    O hash é memorizado por (tamanho, mtime) em `cache_dir/hashes.json`, então
+    o arquivo só é relido quando muda. O índice guarda uma entrada por arquivo
+    existente e é regravado de forma atômica.
+    """
+    stat = os.stat(path)
+    signature = f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    index_path = os.path.join(cache_dir, "hashes.json")
+
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            index = json.load(f)
+    if signature in index:
+        return index[signature]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+
+    # Remove as versões anteriores deste arquivo e as entradas de arquivos que não existem mais
+    source = os.path.abspath(path)
+    index = {
+        key: value for key, value in index.items()
+        if key.rsplit(':', 2)[0] != source and os.path.exists(key.rsplit(':', 2)[0])
+    }
+    index[signature] = digest.hexdigest()
+
+    os.makedirs(cache_dir, exist_ok = True)
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f, indent = 2)
+    os.replace(tmp_path, index_path)
+
+    return index[signature]
+
+def cache_key(path, *params, cache_dir = CACHE_DIR):
+    """
+    Chave do cache: hash do arquivo de origem, versão da limpeza e parâmetros extras
+    """
+    parts = [file_hash(path, cache_dir), cleaning_version()] + [repr(p) for p in params]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:16]
+
+def _write_parquet(df, path):
+    """
+    Grava o Parquet de forma atômica para não deixar entradas corrompidas no cache
+    """
+    tmp_path = f"{path}.tmp"
+    df.to_parquet(tmp_path)
+    os.replace(tmp_path, path)
+
+def load_clean_data(path, cache_dir = CACHE_DIR):
+    """
+    Retorna os dados tratados por `load_data`, lendo do cache Parquet quando válido
+    """
+    entry = os.path.join(cache_dir, cache_key(path, cache_dir = cache_dir))
+    clean_path = os.path.join(entry, "clean.parquet")
+
+    if os.path.exists(clean_path):
+        return pd.read_parquet(clean_path)
+
+    df = utils.load_data(path)
+    os.makedirs(entry, exist_ok = True)
+    _write_parquet(df, clean_path)
+
+    return df
+
+def load_splits(path, features, target, test_size = 0.20, random_state = 42, cache_dir = CACHE_DIR):
+    """
+    Retorna X_train, X_test, y_train, y_test, lendo do cache Parquet quando válido
+
+    A chave inclui as features, o target e os parâmetros da divisão, além do
+    hash do arquivo e da versão da limpeza.
+    """
+    entry = os.path.join(cache_dir, cache_key(path, features, target, test_size, random_state, cache_dir = cache_dir))
+    train_path = os.path.join(entry, "train.parquet")
+    test_path = os.path.join(entry, "test.parquet")
+
+    if os.path.exists(train_path) and os.path.exists(test_path):
+        train_data = pd.read_parquet(train_path)
+        test_data = pd.read_parquet(test_path)
+        return train_data[features], test_data[features], train_data[target], test_data[target]
+
+    data = load_clean_data(path, cache_dir)
+    X_train, X_test, y_train, y_test = utils.split_data(data[features], data[target], test_size, random_state)
+
+    os.makedirs(entry, exist_ok = True)
+    _write_parquet(pd.concat([X_train, y_train], axis = 1), train_path)
+    _write_parquet(pd.concat([X_test, y_test], axis = 1), test_path)
+
+    return X_train, X_test, y_train, y_test
+
+def load_cube(*paths, cache_dir = CACHE_DIR):
+    """
+    Cubo de agregados do app (`aggregates.ChurnCube`) somado sobre `paths`
+
+    O cubo de cada arquivo fica no cache, indexado pelo hash do arquivo e pelas
+    dimensões e bins do cubo, então um arquivo novo (ex.: os dados do mês) só
+    agrega as próprias linhas e os demais são lidos do cache.
+    """
+    from .aggregates import ChurnCube, build_cube, DIMENSIONS, BINS
+
+    total = ChurnCube()
+    bins = {name: edges.tolist() for name, edges in BINS.items()}
+    for path in paths:
+        entry = os.path.join(cache_dir, cache_key(path, 'cube', DIMENSIONS, bins, cache_dir = cache_dir))
+        cube_path = os.path.join(entry, "cube.npz")
+
+        if os.path.exists(cube_path):
+            cube = ChurnCube.load(cube_path)
+        else:
+            cube = build_cube(path)
+            os.makedirs(entry, exist_ok = True)
+            cube.save(cube_path)
+        total = total + cube
+
+    return total
@@ -1,57 +1,194 @@
+import os
+import time
+import argparse
 import pandas as pd
 import numpy as np
-from predict import load_model
-from utils import split_data, load_data
-from sklearn.metrics import accuracy_score, f1_score, roc_auc_score, matthews_corrcoef, make_scorer
-from sklearn.model_selection import StratifiedKFold, cross_val_score
+from joblib import Parallel, delayed
+from .utils import load_pipeline, FEATURES, TARGET
+from .dataset_store import load_splits
+from .bundle import read_threshold
+from .threshold import DEFAULT_THRESHOLD
+from .backends import get_backend
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score, f1_score, roc_auc_score, matthews_corrcoef
+from sklearn.model_selection import RepeatedStratifiedKFold
 
-def evaluation(model, X_test, y_test):
+def compute_metrics(y_true, y_proba, threshold = DEFAULT_THRESHOLD):
     """
-    Avalia o desempenho do modelo no conjunto de teste
+    Calcula as métricas de avaliação a partir de um único vetor de probabilidades
+    """
+    y_pred = (y_proba > threshold).astype(int)
+
+    return {
+        'Acurácia': accuracy_score(y_true, y_pred),
+        'F1 Score': f1_score(y_true, y_pred),
+        'ROC AUC': roc_auc_score(y_true, y_proba),
+        'MCC': matthews_corrcoef(y_true, y_pred)
+    }
+
+def evaluation(model, X_test, y_test, threshold = DEFAULT_THRESHOLD):
+    """
+    Avalia o desempenho do modelo no conjunto de teste, no limiar de decisão informado
     """
     y_proba = model.predict_proba(X_test)[:,1]
-    y_pred = model.predict(X_test)
 
-    results = {
-        'Acurácia': accuracy_score(y_test, y_pred),
-        'F1 Score': f1_score(y_test, y_pred),
-        'ROC AUC': roc_auc_score(y_test, y_proba),
-        'MCC': matthews_corrcoef(y_test, y_pred)
+    return pd.Series(compute_metrics(y_test, y_proba, threshold))
+
+def preprocess_fold(preprocessor, X, y, train_idx, test_idx):
+    """
+    Ajusta uma cópia do pré-processador no treino do fold e transforma treino e teste
+
+    O pré-processador é ajustado uma única vez por fold e as matrizes float32
+    resultantes podem ser reutilizadas por qualquer número de ajustes do modelo.
+    """
+    start = time.perf_counter()
+    preprocessor = clone(preprocessor)
+    X_train = preprocessor.fit_transform(X.iloc[train_idx], y.iloc[train_idx]).astype(np.float32)
+    X_test = preprocessor.transform(X.iloc[test_idx]).astype(np.float32)
+
+    return {
+        'X_train': X_train,
+        'y_train': y.iloc[train_idx].to_numpy(),
+        'X_test': X_test,
+        'y_test': y.iloc[test_idx].to_numpy(),
+        'test_idx': test_idx,
+        'preprocess_s': time.perf_counter() - start
     }
-    return pd.Series(results)
 
-def cross_validation(model, X, y):
+def preprocess_folds(preprocessor, X, y, n_splits = 5, n_repeats = 1, random_state = 42, n_jobs = None):
     """
-    Executa validação cruzada usando o F1 Score
+    Gera as matrizes pré-processadas de todos os folds, em paralelo
     """
-    scoring = make_scorer(f1_score)
-    cv = StratifiedKFold(n_splits = 5)
+    cv = RepeatedStratifiedKFold(n_splits = n_splits, n_repeats = n_repeats, random_state = random_state)
+
+    return Parallel(n_jobs = n_jobs)(
+        delayed(preprocess_fold)(preprocessor, X, y, train_idx, test_idx)
+        for train_idx, test_idx in cv.split(X, y)
+    )
+
+def predict_fold(estimator, fold, thread_count):
+    """
+    Ajusta o modelo em um fold pré-processado e retorna as probabilidades do teste e os tempos
+    """
+    model = clone(estimator).set_params(**{get_backend(estimator).thread_param: thread_count})
+
+    start = time.perf_counter()
+    model.fit(fold['X_train'], fold['y_train'])
+    fit_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_proba = model.predict_proba(fold['X_test'])[:,1]
+    predict_s = time.perf_counter() - start
+
+    return y_proba, fit_s, predict_s
+
+def fit_fold(estimator, fold, thread_count, threshold = DEFAULT_THRESHOLD):
+    """
+    Ajusta o modelo em um fold pré-processado e calcula todas as métricas de uma única predict_proba
+
+    As métricas usam o mesmo limiar de decisão da avaliação no conjunto de teste.
+    """
+    y_proba, fit_s, predict_s = predict_fold(estimator, fold, thread_count)
+
+    return {
+        **compute_metrics(fold['y_test'], y_proba, threshold),
+        'preprocess_s': fold['preprocess_s'],
+        'fit_s': fit_s,
+        'predict_s': predict_s
+    }
 
-    scores = cross_val_score(model, X, y, cv = cv, scoring = scoring)
-    print("Validação Cruzada")
+def _cpu_split(n_folds, n_jobs = None, cpu_budget = None):
+    """
+    Folds ajustados simultaneamente e threads do modelo em cada um
+    """
+    cpu_budget = cpu_budget or os.cpu_count()
+    n_jobs = n_jobs or min(n_folds, cpu_budget)
+
+    return n_jobs, max(1, cpu_budget // n_jobs)
+
+def out_of_fold_proba(model, X, y, n_splits = 5, n_jobs = None, cpu_budget = None):
+    """
+    Probabilidades fora do fold de cada linha de `X` (validação cruzada estratificada)
+
+    Cada linha é pontuada por um modelo que não a viu no treino, então as
+    probabilidades servem para escolher o limiar sem usar o conjunto de teste.
+    """
+    n_jobs, thread_count = _cpu_split(n_splits, n_jobs, cpu_budget)
+    estimator = model.named_steps['model']
+
+    folds = preprocess_folds(model.named_steps['preprocessor'], X, y, n_splits, n_jobs = n_jobs)
+    probabilities = Parallel(n_jobs = n_jobs, prefer = 'threads')(
+        delayed(predict_fold)(estimator, fold, thread_count) for fold in folds
+    )
+
+    y_proba = np.empty(len(X))
+    for fold, (fold_proba, _, _) in zip(folds, probabilities):
+        y_proba[fold['test_idx']] = fold_proba
+
+    return y_proba
+
+def cross_validation(model, X, y, n_splits = 5, n_repeats = 1, n_jobs = None, cpu_budget = None,
+                     threshold = DEFAULT_THRESHOLD):
+    """
+    Executa validação cruzada estratificada (repetida) com folds ajustados em paralelo
+
+    - `cpu_budget`: total de núcleos disponíveis (padrão: todos)
+    - `n_jobs`: folds ajustados simultaneamente; cada um usa cpu_budget // n_jobs threads do modelo
+    - `threshold`: limiar de decisão das métricas de cada fold
+
+    Retorna um DataFrame com as métricas e os tempos de cada fold.
+    """
+    n_jobs, thread_count = _cpu_split(n_splits * n_repeats, n_jobs, cpu_budget)
+
+    preprocessor = model.named_steps['preprocessor']
+    estimator = model.named_steps['model']
+
+    folds = preprocess_folds(preprocessor, X, y, n_splits, n_repeats, n_jobs = n_jobs)
+
+    # Os três backends liberam o GIL durante o ajuste, então threads bastam e evitam copiar as matrizes
+    results = Parallel(n_jobs = n_jobs, prefer = 'threads')(
+        delayed(fit_fold)(estimator, fold, thread_count, threshold) for fold in folds
+    )
+    results = pd.DataFrame(results)
+    results.index = pd.MultiIndex.from_product([range(n_repeats), range(n_splits)], names = ['repetição', 'fold'])
+
+    print(f"Validação Cruzada (limiar {threshold:.2f})")
     print(f"{'-' * 25}")
-    print(f"Média dos F1 Scores: {scores.mean()}")
-    print(f"Desvio Padráo dos F1 Scores: {scores.std()}")
+    print(results.round(4).to_string())
+    print(f"\nMédia:\n{results.mean().round(4).to_string()}")
+    print(f"\nDesvio Padrão:\n{results.std().round(4).to_string()}")
 
-    return scores.mean(), scores.std(), scores
+    return results
 
-if __name__=="__main__":
-    # Carregar os dados e o modelo treinado
-    data = load_data("data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv")
-    model = load_model("models/classifier.pkl")
+def main(argv = None):
+    """
+    Ponto de entrada do subcomando `evaluate` (python -m scr evaluate)
+    """
+    parser = argparse.ArgumentParser(description = "Avalia o modelo de churn")
+    parser.add_argument("--splits", type = int, default = 5)
+    parser.add_argument("--repeats", type = int, default = 1)
+    parser.add_argument("--jobs", type = int, default = None, help = "Folds ajustados simultaneamente")
+    parser.add_argument("--cpu-budget", type = int, default = None, help = "Total de núcleos a utilizar")
+    args = parser.parse_args(argv)
 
-    # Separar as features e target
-    X = data.drop(columns = ['Churn', 'customerID'], axis = 1)
-    y = data['Churn']
+    # Carregar o modelo treinado e o limiar de decisão salvo
+    model = load_pipeline("models/classifier")
+    threshold = read_threshold("models/classifier")
 
-    # Dividir os dados em treino e teste
-    X_train, X_test, y_train, y_test = split_data(X, y)
+    # Dividir os dados em treino e teste (via cache)
+    X_train, X_test, y_train, y_test = load_splits(
+        "data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv", FEATURES, TARGET
+    )
 
     # realizar a validação cruzada
-    mean_f1, std_f1, all_scores = cross_validation(model, X_train, y_train)
+    start = time.perf_counter()
+    cross_validation(model, X_train, y_train, args.splits, args.repeats, args.jobs, args.cpu_budget, threshold)
+    print(f"\nTempo total da validação cruzada: {time.perf_counter() - start:.1f}s")
 
-    # Avaliar o modelo no conjunto de teste
-    print("\nMétricas de avaliação")
+    # Avaliar o modelo no conjunto de teste, no limiar salvo
+    print(f"\nMétricas de avaliação (limiar {threshold:.2f})")
     print(f"{'-' * 25}")
-    print(evaluation(model, X_test, y_test))
-   
\ No newline at end of file
+    print(evaluation(model, X_test, y_test, threshold).to_string())
+
+    # O limiar não é escolhido aqui: escolhê-lo no teste enviesaria as métricas acima
+    print("\nPara escolher o limiar (validação cruzada no treino): python -m scr threshold --save")
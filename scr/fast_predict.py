@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+from .backends import get_backend
+
+# Até este número de linhas a codificação é feita com dicionários Python,
+# acima dele é vetorizada com pandas.Categorical
+SMALL_BATCH = 256
+
+def export_tables(pipeline):
+    """
+    Congela o pré-processador treinado em tabelas de lookup e constantes NumPy
+
+    - Categóricas: valor de imputação (moda), categorias conhecidas e o valor do
+      Target Encoding de cada uma, além do valor usado para categorias novas
+    - Numéricas: medianas de imputação
+    """
+    preprocessor = pipeline.named_steps['preprocessor']
+    cat_transformer = preprocessor.named_transformers_['cat']
+    num_transformer = preprocessor.named_transformers_['num']
+    encoder = cat_transformer.named_steps['cat_encoding']
+
+    columns = {name: list(cols) for name, _, cols in preprocessor.transformers_}
+    cat_features, num_features = columns['cat'], columns['num']
+
+    if hasattr(encoder, 'lookup_tables'):
+        # StreamingTargetEncoder: imputação e encoding já em tabelas
+        tables = encoder.lookup_tables()
+        fill_values, categories, encodings, unknown = (
+            tables['fill_values'], tables['categories'], tables['encodings'], tables['unknown']
+        )
+    else:
+        imputer = cat_transformer.named_steps['cat_imput']
+        fill_values = {col: imputer.imputer_dict_[col] for col in cat_features}
+
+        categories, encodings, unknown = {}, {}, {}
+        for ordinal in encoder.ordinal_encoder.mapping:
+            col = ordinal['col']
+            codes = ordinal['mapping'].drop(labels = [np.nan], errors = 'ignore')
+            mapping = encoder.mapping[col]
+
+            categories[col] = np.asarray(codes.index, dtype = object)
+            encodings[col] = mapping.loc[codes.values].to_numpy(dtype = np.float64)
+            unknown[col] = float(mapping.loc[-1])
+
+    medians = num_transformer.named_steps['num_imput'].imputer_dict_
+
+    return {
+        'cat_features': cat_features,
+        'num_features': num_features,
+        'fill_values': fill_values,
+        'categories': categories,
+        'encodings': encodings,
+        'unknown': unknown,
+        'medians': np.array([medians[col] for col in num_features], dtype = np.float64)
+    }
+
+class FastScorer:
+    """
+    Pontuador leve que aplica as tabelas congeladas e chama o modelo diretamente
+
+    Evita o overhead do Pipeline/ColumnTransformer por chamada e produz as mesmas
+    probabilidades do pipeline completo. Aceita um dicionário (uma linha), uma
+    lista de dicionários ou um DataFrame.
+    """
+    def __init__(self, tables, model):
+        self.tables = tables
+        self.model = model
+        self.cat_features = tables['cat_features']
+        self.num_features = tables['num_features']
+        self.n_features = len(self.cat_features) + len(self.num_features)
+        self._required = frozenset(self.cat_features + self.num_features)
+        self._lookup = {
+            col: dict(zip(tables['categories'][col], tables['encodings'][col]))
+            for col in self.cat_features
+        }
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        if isinstance(pipeline, FastScorer):
+            return pipeline
+        return cls(export_tables(pipeline), pipeline.named_steps['model'])
+
+    def _check_rows(self, rows):
+        """
+        Garante que cada linha é um dicionário com todas as colunas do modelo
+
+        Colunas ausentes seriam imputadas silenciosamente (pela moda/mediana no
+        caminho de dicionários, como NaN ao montar o DataFrame).
+        """
+        for i, row in enumerate(rows):
+            if not isinstance(row, dict):
+                raise TypeError(f"Linha {i}: esperado um dicionário, recebido {type(row).__name__}")
+            if not row.keys() >= self._required:
+                raise KeyError(f"Linha {i}: colunas ausentes {sorted(self._required.difference(row))}")
+
+    def _check_columns(self, data):
+        missing = self._required.difference(data.columns)
+        if missing:
+            raise KeyError(f"Colunas ausentes: {sorted(missing)}")
+
+    def _encode_rows(self, rows):
+        """
+        Codifica poucas linhas (dicionários) com lookups em dicionários Python
+        """
+        fill_values, unknown, medians = self.tables['fill_values'], self.tables['unknown'], self.tables['medians']
+        X = np.empty((len(rows), self.n_features), dtype = np.float64)
+
+        for i, row in enumerate(rows):
+            for j, col in enumerate(self.cat_features):
+                value = row.get(col)
+                if value is None or value != value:
+                    value = fill_values[col]
+                X[i, j] = self._lookup[col].get(value, unknown[col])
+            for k, col in enumerate(self.num_features):
+                value = row.get(col)
+                X[i, len(self.cat_features) + k] = medians[k] if value is None or value != value else value
+
+        return X
+
+    def _encode_frame(self, data):
+        """
+        Codifica um DataFrame de forma vetorizada, coluna a coluna
+        """
+        tables = self.tables
+        X = np.empty((len(data), self.n_features), dtype = np.float64)
+
+        for j, col in enumerate(self.cat_features):
+            values = data[col].fillna(tables['fill_values'][col])
+            codes = pd.Categorical(values, categories = tables['categories'][col]).codes
+            encoded = tables['encodings'][col][codes]
+            encoded[codes == -1] = tables['unknown'][col]
+            X[:, j] = encoded
+
+        numeric = data[self.num_features].to_numpy(dtype = np.float64)
+        X[:, len(self.cat_features):] = np.where(np.isnan(numeric), tables['medians'], numeric)
+
+        return X
+
+    def transform(self, data):
+        """
+        Aplica as tabelas congeladas e retorna a matriz de features do modelo
+        """
+        if isinstance(data, dict):
+            data = [data]
+        if isinstance(data, list):
+            self._check_rows(data)
+            if len(data) <= SMALL_BATCH:
+                return self._encode_rows(data)
+            data = pd.DataFrame(data)
+        elif isinstance(data, pd.DataFrame):
+            self._check_columns(data)
+        else:
+            raise TypeError(f"Esperado um dicionário, lista de dicionários ou DataFrame, recebido {type(data).__name__}")
+        if len(data) <= SMALL_BATCH:
+            columns = list(data.columns)
+            return self._encode_rows([dict(zip(columns, row)) for row in data.to_numpy(dtype = object)])
+        return self._encode_frame(data)
+
+    def predict_proba(self, data):
+        X = self.transform(data)
+        # Para lotes pequenos o pool de threads do modelo custa mais do que economiza
+        thread_count = 1 if len(X) <= SMALL_BATCH else -1
+        model = self.model
+        return get_backend(model).predict_proba(model, X, thread_count)
+
+    def predict(self, data):
+        return self.predict_proba(data).argmax(axis = 1)
@@ -0,0 +1,216 @@
+"""
+Instrumentação por estágio dos scripts de treino e predição
+
+Ativada por variáveis de ambiente, sem alterar a linha de comando:
+
+- CHURN_INSTRUMENT=1: registra, por estágio, tempo de parede, tempo de CPU,
+  linhas processadas e pico de memória (RSS). Ao final da execução grava uma
+  linha JSON por estágio (em CHURN_INSTRUMENT_LOG, ou stderr) e imprime uma
+  tabela de resumo.
+- CHURN_PROFILE=arquivo.prof: executa a sessão sob o cProfile e salva as
+  estatísticas no arquivo (para `pstats` ou snakeviz).
+
+Desativada, `stage` devolve um contexto nulo compartilhado e o custo é o de uma
+chamada de função por estágio. Para amostragem externa com o py-spy nada
+precisa ser ativado: `py-spy record -o perfil.svg -- python -m scr predict`.
+"""
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+from .utils import peak_rss_mb
+
+ENABLED = os.environ.get("CHURN_INSTRUMENT", "") not in ("", "0")
+LOG_PATH = os.environ.get("CHURN_INSTRUMENT_LOG")
+PROFILE_PATH = os.environ.get("CHURN_PROFILE")
+
+_stats = {}
+_lock = threading.Lock()
+
+class _NullStage:
+    """
+    Estágio usado quando a instrumentação está desativada
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add_rows(self, rows):
+        pass
+
+_NULL_STAGE = _NullStage()
+
+class Stage:
+    """
+    Mede um trecho de código e acumula o resultado nas estatísticas do estágio
+
+    Um estágio executado várias vezes (por exemplo, uma vez por bloco) é
+    agregado: tempos e linhas são somados e o pico de memória é o máximo.
+    """
+    def __init__(self, name, rows = None):
+        self.name = name
+        self.rows = rows or 0
+
+    def add_rows(self, rows):
+        self.rows += rows
+
+    def __enter__(self):
+        self._rss = peak_rss_mb() or 0.0
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        rss = peak_rss_mb() or 0.0
+
+        with _lock:
+            stats = _stats.setdefault(self.name, {
+                'stage': self.name, 'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0,
+                'rows': 0, 'peak_rss_mb': 0.0, 'rss_growth_mb': 0.0
+            })
+            stats['calls'] += 1
+            stats['wall_s'] += wall
+            stats['cpu_s'] += cpu
+            stats['rows'] += self.rows
+            stats['peak_rss_mb'] = max(stats['peak_rss_mb'], rss)
+            stats['rss_growth_mb'] = max(stats['rss_growth_mb'], rss - self._rss)
+        return False
+
+def stage(name, rows = None):
+    """
+    Contexto que mede um estágio; as linhas podem ser informadas aqui ou com `add_rows`
+    """
+    if not ENABLED:
+        return _NULL_STAGE
+    return Stage(name, rows)
+
+def iter_stage(name, iterable):
+    """
+    Mede a produção de cada item de um iterável (por exemplo, a leitura de blocos de um arquivo)
+    """
+    if not ENABLED:
+        yield from iterable
+        return
+
+    iterator = iter(iterable)
+    while True:
+        with stage(name) as measured:
+            item = next(iterator, _NULL_STAGE)
+            if item is not _NULL_STAGE:
+                measured.add_rows(len(item))
+        if item is _NULL_STAGE:
+            return
+        yield item
+
+def _timed(name, method):
+    def wrapper(X, *args, **kwargs):
+        with stage(name, len(X)):
+            return method(X, *args, **kwargs)
+    return wrapper
+
+def instrument_pipeline(pipeline):
+    """
+    Mede separadamente cada etapa do Pipeline na predição
+
+    Substitui, na própria instância, o `transform` de cada transformador folha
+    (imputação, Target Encoding) e o `predict_proba` do modelo por versões
+    medidas. Sem instrumentação ativa, devolve o Pipeline inalterado.
+    """
+    if not ENABLED:
+        return pipeline
+    if not hasattr(pipeline, 'named_steps'):
+        # Bundle/FastScorer: mede a aplicação das tabelas congeladas
+        if hasattr(pipeline, 'tables'):
+            pipeline.transform = _timed('preprocessor', pipeline.transform)
+        return pipeline
+
+    def instrument(name, step):
+        if hasattr(step, 'steps'):
+            for sub_name, sub_step in step.steps:
+                instrument(sub_name, sub_step)
+        elif hasattr(step, 'transformers_'):
+            for sub_name, sub_step, _ in step.transformers_:
+                if hasattr(sub_step, 'transform'):
+                    instrument(sub_name, sub_step)
+        elif hasattr(step, 'predict_proba'):
+            step.predict_proba = _timed(name, step.predict_proba)
+        else:
+            step.transform = _timed(name, step.transform)
+
+    instrument('pipeline', pipeline)
+    preprocessor = pipeline.steps[0][1]
+    preprocessor.transform = _timed(pipeline.steps[0][0], preprocessor.transform)
+
+    return pipeline
+
+def summary():
+    """
+    Estatísticas acumuladas por estágio, na ordem em que os estágios começaram a ser medidos
+    """
+    with _lock:
+        records = [dict(stats) for stats in _stats.values()]
+
+    for record in records:
+        record['rows_per_s'] = record['rows'] / record['wall_s'] if record['rows'] and record['wall_s'] else None
+    return records
+
+def format_summary(records):
+    """
+    Tabela de resumo em texto
+    """
+    header = f"{'Estágio':<16}{'Chamadas':>9}{'Parede (s)':>12}{'CPU (s)':>10}{'Linhas':>12}{'Linhas/s':>13}{'Pico (MB)':>11}"
+    lines = [header, '-' * len(header)]
+    for r in records:
+        rate = f"{r['rows_per_s']:,.0f}" if r['rows_per_s'] else '-'
+        lines.append(
+            f"{r['stage']:<16}{r['calls']:>9}{r['wall_s']:>12.3f}{r['cpu_s']:>10.3f}"
+            f"{r['rows']:>12,}{rate:>13}{r['peak_rss_mb']:>11.0f}"
+        )
+    return "\n".join(lines)
+
+def report(run):
+    """
+    Grava uma linha JSON por estágio e imprime a tabela de resumo
+    """
+    records = summary()
+    if not records:
+        return
+
+    log = open(LOG_PATH, 'a') if LOG_PATH else sys.stderr
+    try:
+        for record in records:
+            log.write(json.dumps({'run': run, **record}) + "\n")
+    finally:
+        if LOG_PATH:
+            log.close()
+
+    print(f"\nInstrumentação ({run})")
+    print(format_summary(records))
+
+@contextmanager
+def session(run):
+    """
+    Envolve a execução de um script: ativa o cProfile se configurado e emite o relatório ao final
+    """
+    profiler = None
+    if PROFILE_PATH:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        with stage('total'):
+            yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(PROFILE_PATH)
+            print(f"\nPerfil do cProfile salvo em {PROFILE_PATH}")
+        if ENABLED:
+            report(run)
@@ -0,0 +1,83 @@
+import threading
+import pandas as pd
+from .labels import prepare_input
+from .predict import predict_in_batches, ID_COLUMNS
+from .writers import get_writer
+from .monitoring import DriftMonitor
+
+def iter_upload(file, name, chunksize = 50_000):
+    """
+    Lê um arquivo enviado (.csv ou .parquet) em blocos, junto com a fração já lida
+
+    Para .parquet a fração é calculada pelas linhas do metadado; para .csv, pela
+    posição no arquivo.
+    """
+    if name.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(file)
+        total, rows = parquet.metadata.num_rows, 0
+        for batch in parquet.iter_batches(batch_size = chunksize):
+            rows += batch.num_rows
+            yield batch.to_pandas(), rows / max(total, 1)
+    else:
+        size = file.seek(0, 2)
+        file.seek(0)
+        for chunk in pd.read_csv(file, chunksize = chunksize):
+            yield chunk, file.tell() / max(size, 1)
+
+class ScoringJob(threading.Thread):
+    """
+    Pontua um arquivo em uma thread separada, bloco a bloco
+
+    Cada bloco é traduzido e validado com `prepare_input`, pontuado com
+    `predict_in_batches` e gravado no arquivo de saída, então a memória da
+    pontuação depende apenas do tamanho do bloco (no app, o arquivo enviado e o
+    download continuam inteiros na memória do Streamlit). O progresso fica
+    disponível em `rows` e `fraction`, e os avisos de validação em `warnings`.
+    Se o modelo tiver uma referência de treino (bundles), `monitor` acumula o
+    drift dos blocos.
+    """
+    def __init__(self, model, chunks, output_path, fmt = None, batch_size = 10_000, max_warnings = 20):
+        super().__init__(daemon = True)
+        self.model = model
+        self.chunks = chunks
+        self.output_path = output_path
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.max_warnings = max_warnings
+        self.rows = 0
+        self.fraction = 0.0
+        self.warnings = []
+        self.error = None
+
+        reference = getattr(model, 'reference', None)
+        self.monitor = DriftMonitor(reference) if reference is not None else None
+
+    def _prepared_chunks(self):
+        for chunk, fraction in self.chunks:
+            prepared, errors = prepare_input(chunk)
+            if prepared is None:
+                raise ValueError("; ".join(errors))
+            self.warnings.extend(errors[:self.max_warnings - len(self.warnings)])
+
+            for col in ID_COLUMNS:
+                if col in chunk.columns:
+                    prepared[col] = chunk[col]
+            yield prepared
+            self.fraction = fraction
+
+    def run(self):
+        writer = get_writer(self.output_path, self.fmt)
+        try:
+            for result in predict_in_batches(self.model, self._prepared_chunks(), self.batch_size, monitor = self.monitor):
+                writer.write(result)
+                self.rows += len(result)
+            self.fraction = 1.0
+        except Exception as exc:
+            self.error = exc
+        finally:
+            writer.close()
+
+    @property
+    def done(self):
+        return not self.is_alive() and self.error is None and self.fraction == 1.0
@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+from .utils import TELCO_SCHEMA, YES_NO, FEATURES
+
+# Mapeamento dos rótulos da interface (português) para as categorias do modelo
+LABEL_MAPPING = {
+    'Masculino': 'Male',
+    'Feminino': 'Female',
+    'Sim': 'Yes',
+    'Não': 'No',
+    'Fibra ótica': 'Fiber optic',
+    'Não possui linha': 'No phone service',
+    'Não possui internet': 'No internet service'
+}
+
+# Mapeamentos específicos por coluna, aplicados antes do mapeamento geral
+COLUMN_MAPPING = {
+    'SeniorCitizen': {0: 'No', 1: 'Yes', '0': 'No', '1': 'Yes'}
+}
+
+# Tipos esperados pelo modelo (SeniorCitizen já como texto)
+MODEL_DTYPES = {col: TELCO_SCHEMA[col] for col in FEATURES}
+MODEL_DTYPES['SeniorCitizen'] = YES_NO
+
+CATEGORICAL_FEATURES = [col for col in FEATURES if isinstance(MODEL_DTYPES[col], pd.CategoricalDtype)]
+NUMERIC_FEATURES = [col for col in FEATURES if col not in CATEGORICAL_FEATURES]
+CATEGORY_CODES = {col: {value: code for code, value in enumerate(MODEL_DTYPES[col].categories)}
+                  for col in CATEGORICAL_FEATURES}
+
+# Até este número de linhas a entrada é preparada em Python puro: para poucas
+# linhas o custo fixo das operações do pandas por coluna domina
+SMALL_INPUT = 64
+
+def translate_column(series, mapping = LABEL_MAPPING):
+    """
+    Traduz os rótulos de uma coluna para as categorias do modelo
+
+    O mapeamento é aplicado às categorias distintas, e não célula a célula:
+    a coluna é convertida para categórica e os códigos indexam o vetor de
+    categorias traduzidas.
+    """
+    column_mapping = {**mapping, **COLUMN_MAPPING.get(series.name, {})}
+    categorical = series.astype('category')
+    codes = categorical.cat.codes.to_numpy()
+
+    translated = np.array([column_mapping.get(v, v) for v in categorical.cat.categories] + [np.nan], dtype = object)
+    return pd.Series(translated[codes], index = series.index, name = series.name)
+
+def _is_missing(value):
+    return value is None or value != value or (isinstance(value, str) and not value.strip())
+
+def validate_records(records, mapping = LABEL_MAPPING):
+    """
+    Traduz e valida linhas (dicionários) em Python puro, sem pandas
+
+    Retorna as linhas com as features nos valores do modelo (categorias
+    traduzidas, numéricos como float e nulos como NaN) e a lista de erros, nos
+    mesmos termos de `prepare_input`.
+    """
+    missing = {col for row in records for col in FEATURES if col not in row}
+    if missing:
+        return None, [f"Colunas ausentes: {', '.join(col for col in FEATURES if col in missing)}"]
+
+    unknown = {col: [] for col in CATEGORICAL_FEATURES}
+    invalid = dict.fromkeys(NUMERIC_FEATURES, 0)
+    translated = []
+
+    for row in records:
+        values = {}
+        for col in CATEGORICAL_FEATURES:
+            value = row[col]
+            if _is_missing(value):
+                value = np.nan
+            else:
+                value = COLUMN_MAPPING.get(col, {}).get(value, mapping.get(value, value))
+                if value not in CATEGORY_CODES[col]:
+                    unknown[col].append(value)
+            values[col] = value
+
+        for col in NUMERIC_FEATURES:
+            value = row[col]
+            try:
+                value = np.nan if _is_missing(value) else float(value)
+            except (TypeError, ValueError):
+                value = -1.0
+            if value < 0:
+                invalid[col] += 1
+                value = np.nan
+            values[col] = value
+        translated.append(values)
+
+    errors = [
+        f"{col}: {len(values)} valores desconhecidos ({', '.join(map(str, list(dict.fromkeys(values))[:5]))})"
+        for col, values in unknown.items() if values
+    ]
+    errors += [f"{col}: {count} valores numéricos inválidos" for col, count in invalid.items() if count]
+
+    return translated, errors
+
+def _prepare_small(data, mapping):
+    """
+    Prepara poucas linhas com lookups em dicionários, sem operações por coluna do pandas
+
+    As categóricas são montadas direto dos códigos, então os tipos são os mesmos
+    do caminho vetorizado (`category` e float32).
+    """
+    records, errors = validate_records(data[FEATURES].to_dict('records'), mapping)
+
+    columns = {
+        col: pd.Categorical.from_codes(
+            [CATEGORY_CODES[col].get(row[col], -1) for row in records], dtype = MODEL_DTYPES[col], validate = False
+        )
+        for col in CATEGORICAL_FEATURES
+    }
+    columns.update({col: np.asarray([row[col] for row in records], dtype = np.float32) for col in NUMERIC_FEATURES})
+
+    return pd.DataFrame(columns, index = data.index, columns = FEATURES), errors
+
+def prepare_input(data, mapping = LABEL_MAPPING):
+    """
+    Traduz os rótulos e valida os dados de entrada do preditor
+
+    Retorna o DataFrame com as features nos tipos do modelo (categóricas como
+    `category`, numéricas como float32) e a lista de erros encontrados:
+    colunas ausentes, categorias desconhecidas e valores numéricos inválidos.
+    """
+    errors = []
+    missing = [col for col in FEATURES if col not in data.columns]
+    if missing:
+        return None, [f"Colunas ausentes: {', '.join(missing)}"]
+
+    if len(data) <= SMALL_INPUT:
+        return _prepare_small(data, mapping)
+
+    prepared = pd.DataFrame(index = data.index)
+    for col in CATEGORICAL_FEATURES:
+        translated = translate_column(data[col], mapping)
+        prepared[col] = translated.astype(MODEL_DTYPES[col])
+
+        invalid = prepared[col].isna() & translated.notna()
+        if invalid.any():
+            values = ', '.join(map(str, translated[invalid].unique()[:5]))
+            errors.append(f"{col}: {invalid.sum()} valores desconhecidos ({values})")
+
+    for col in NUMERIC_FEATURES:
+        values = data[col]
+        if values.dtype == object:
+            # Valores em branco (como em TotalCharges no CSV original) são tratados como nulos
+            values = values.mask(values.astype(str).str.strip() == '')
+        numeric = pd.to_numeric(values, errors = 'coerce')
+        invalid = (numeric.isna() & values.notna()) | (numeric < 0)
+        if invalid.any():
+            errors.append(f"{col}: {invalid.sum()} valores numéricos inválidos")
+        prepared[col] = numeric.where(~invalid).astype('float32')
+
+    return prepared[FEATURES], errors
@@ -0,0 +1,191 @@
+"""
+Monitoramento de drift e qualidade dos dados durante a pontuação
+
+No treino, `build_reference` resume cada feature do conjunto de treino: taxa
+de nulos e proporções por categoria (categóricas) ou por bin de quantis
+(numéricas). A referência é gravada no bundle do modelo.
+
+Na pontuação, `DriftMonitor.update` acumula só contagens por bloco (nulos,
+categorias novas e histogramas nos mesmos bins da referência), na mesma
+passada que gera as predições. Ao final, `report` compara com a referência:
+PSI, taxa de nulos e taxa de categorias que o Target Encoding não conhece.
+"""
+import json
+import numpy as np
+import pandas as pd
+
+# Limites usuais do PSI: < 0,1 estável, 0,1 a 0,25 atenção, > 0,25 drift
+PSI_WARNING = 0.10
+PSI_ALERT = 0.25
+
+# Aumento da taxa de nulos / taxa de categorias novas que gera alerta
+NULL_RATE_ALERT = 0.01
+UNSEEN_RATE_ALERT = 0.01
+
+# Proporção mínima usada no PSI, para bins vazios em um dos lados
+EPSILON = 1e-4
+
+def build_reference(X, n_bins = 10):
+    """
+    Resumo de cada feature de `X` usado como referência do monitoramento
+
+    Numéricas: cortes nos quantis (até `n_bins` bins) e proporção por bin.
+    Categóricas: proporção de cada categoria observada. Ambas com a taxa de
+    nulos. O resultado é serializável em JSON.
+    """
+    reference = {'rows': len(X), 'features': {}}
+
+    for col in X.columns:
+        values = X[col]
+        null_rate = float(values.isna().mean())
+
+        if pd.api.types.is_numeric_dtype(values) and not isinstance(values.dtype, pd.CategoricalDtype):
+            present = values.dropna().to_numpy(dtype = np.float64)
+            # Uma coluna toda nula no treino fica com um único bin
+            edges = np.unique(np.quantile(present, np.linspace(0, 1, n_bins + 1)[1:-1])) if len(present) else np.empty(0)
+            counts = np.bincount(np.searchsorted(edges, present, side = 'right'), minlength = len(edges) + 1)
+            reference['features'][col] = {
+                'type': 'numeric',
+                'null_rate': null_rate,
+                'edges': edges.tolist(),
+                'proportions': (counts / max(counts.sum(), 1)).tolist()
+            }
+        else:
+            counts = values.astype(str)[values.notna()].value_counts()
+            reference['features'][col] = {
+                'type': 'categorical',
+                'null_rate': null_rate,
+                'categories': counts.index.tolist(),
+                'proportions': (counts / max(counts.sum(), 1)).tolist()
+            }
+
+    return reference
+
+def psi(expected, actual):
+    """
+    Population Stability Index entre duas distribuições de proporções
+    """
+    expected = np.clip(np.asarray(expected, dtype = np.float64), EPSILON, None)
+    actual = np.clip(np.asarray(actual, dtype = np.float64), EPSILON, None)
+
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+class DriftMonitor:
+    """
+    Acumula, bloco a bloco, as contagens necessárias para comparar a entrada com a referência
+
+    O estado tem tamanho fixo (um histograma por feature), independente do
+    número de linhas pontuadas. Categorias fora da referência vão para um bin
+    extra, contado como "nova".
+    """
+    def __init__(self, reference):
+        self.reference = reference
+        self.rows = 0
+        self.nulls = {col: 0 for col in reference['features']}
+        self.counts = {}
+        self._categories = {}
+        self._edges = {}
+
+        for col, ref in reference['features'].items():
+            if ref['type'] == 'numeric':
+                self._edges[col] = np.asarray(ref['edges'], dtype = np.float64)
+                self.counts[col] = np.zeros(len(ref['edges']) + 1, dtype = np.int64)
+            else:
+                self._categories[col] = pd.Index(ref['categories'])
+                self.counts[col] = np.zeros(len(ref['categories']) + 1, dtype = np.int64)
+
+    def update(self, chunk):
+        """
+        Acumula um bloco; colunas ausentes do bloco contam como nulas
+        """
+        self.rows += len(chunk)
+
+        for col, counts in self.counts.items():
+            if col not in chunk.columns:
+                self.nulls[col] += len(chunk)
+                continue
+
+            if col in self._edges:
+                values = pd.to_numeric(chunk[col], errors = 'coerce').to_numpy(dtype = np.float64)
+                present = values[~np.isnan(values)]
+                bins = np.searchsorted(self._edges[col], present, side = 'right')
+            else:
+                # Só os valores distintos do bloco são comparados com as categorias da referência
+                codes, uniques = pd.factorize(chunk[col])
+                lookup = self._categories[col].get_indexer(pd.Index(uniques).astype(str))
+                lookup[lookup == -1] = len(counts) - 1
+                present = codes[codes >= 0]
+                bins = lookup[present]
+
+            self.nulls[col] += len(chunk) - len(present)
+            counts += np.bincount(bins, minlength = len(counts))
+
+        return self
+
+    def report(self):
+        """
+        Uma linha por feature: taxa de nulos (atual e do treino), taxa de categorias novas, PSI e status
+
+        Features sem nenhum valor presente na entrada ficam em "alerta".
+        """
+        rows = []
+        for col, ref in self.reference['features'].items():
+            counts = self.counts[col]
+            null_rate = self.nulls[col] / max(self.rows, 1)
+
+            if ref['type'] == 'numeric':
+                unseen_rate = np.nan
+                value = psi(ref['proportions'], counts / max(counts.sum(), 1))
+            else:
+                unseen_rate = counts[-1] / max(counts.sum(), 1)
+                value = psi(ref['proportions'] + [0.0], counts / max(counts.sum(), 1))
+
+            # Sem nenhum valor presente o PSI não é definido, mas a feature chegou vazia
+            empty = counts.sum() == 0 and self.rows > 0
+            if counts.sum() == 0:
+                value = np.nan
+
+            if (empty or value > PSI_ALERT or null_rate - ref['null_rate'] > NULL_RATE_ALERT
+                    or unseen_rate > UNSEEN_RATE_ALERT):
+                status = 'alerta'
+            elif value > PSI_WARNING:
+                status = 'atenção'
+            else:
+                status = 'ok'
+
+            rows.append({
+                'feature': col,
+                'null_rate': null_rate,
+                'ref_null_rate': ref['null_rate'],
+                'unseen_rate': unseen_rate,
+                'psi': value,
+                'status': status
+            })
+
+        return pd.DataFrame(rows).set_index('feature')
+
+    def to_json(self, path):
+        """
+        Grava o relatório em JSON, com o total de linhas monitoradas
+        """
+        report = self.report()
+        with open(path, 'w') as f:
+            json.dump({
+                'rows': self.rows,
+                'reference_rows': self.reference['rows'],
+                'features': json.loads(report.to_json(orient = 'index'))
+            }, f, indent = 2)
+
+def format_report(report, only_flagged = False):
+    """
+    Relatório em texto, com as features fora do status "ok" primeiro
+    """
+    if only_flagged:
+        report = report[report['status'] != 'ok']
+    if report.empty:
+        return "Nenhum drift ou problema de qualidade detectado."
+
+    order = report['status'].map({'alerta': 0, 'atenção': 1, 'ok': 2})
+    report = report.assign(_order = order).sort_values(['_order', 'psi'], ascending = [True, False]).drop(columns = '_order')
+
+    return report.to_string(float_format = lambda value: f"{value:.4f}", na_rep = '-')
@@ -0,0 +1,95 @@
+import os
+import numpy as np
+import pandas as pd
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from .utils import load_model
+from .bundle import read_threshold
+
+# Modelo carregado uma única vez em cada processo worker
+_worker_model = None
+_worker_explainers = {}
+
+def _init_worker(model_path):
+    """
+    Inicializa o worker carregando o modelo treinado
+    """
+    global _worker_model
+    _worker_model = load_model(model_path)
+
+def _score_shard(shard):
+    """
+    Calcula as probabilidades de um shard com o modelo do worker
+    """
+    return _worker_model.predict_proba(shard)
+
+def _explain_shard(shard, top_k, approximate):
+    """
+    Calcula os principais fatores de um shard com o explainer do worker (uma thread por worker)
+    """
+    from .explain import Explainer
+
+    if approximate not in _worker_explainers:
+        _worker_explainers[approximate] = Explainer(_worker_model, approximate = approximate, thread_count = 1)
+    return _worker_explainers[approximate].explain(shard, top_k)
+
+def iter_shards(data, shard_size):
+    """
+    Divide o DataFrame em shards consecutivos de `shard_size` linhas
+    """
+    for start in range(0, len(data), shard_size):
+        yield data.iloc[start:start + shard_size]
+
+class ParallelScorer:
+    """
+    Distribui a pontuação entre um pool de processos
+
+    Cada worker carrega `model_path` uma vez na inicialização e pontua os shards
+    que recebe. Expõe `predict_proba`, então pode substituir o modelo em
+    `make_predictions`; os resultados voltam na ordem original das linhas.
+    Cada chamada é dividida em shards de até `shard_size` linhas, mas nunca em
+    menos shards do que workers, para que um lote pequeno ocupe todo o pool.
+    """
+    def __init__(self, model_path, n_workers = None, shard_size = 10_000):
+        self.model_path = model_path
+        self.n_workers = n_workers or os.cpu_count()
+        self.shard_size = shard_size
+        self.threshold = read_threshold(model_path)
+        self._executor = None
+
+    def __enter__(self):
+        self._executor = ProcessPoolExecutor(
+            max_workers = self.n_workers,
+            initializer = _init_worker,
+            initargs = (self.model_path,)
+        )
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _shard_size(self, n_rows):
+        return max(1, min(self.shard_size, -(-n_rows // self.n_workers)))
+
+    def predict_proba(self, data):
+        if self._executor is None:
+            raise RuntimeError("ParallelScorer deve ser usado como context manager")
+
+        # Executor.map submete todos os shards de uma vez e preserva a ordem de submissão
+        results = self._executor.map(_score_shard, iter_shards(data, self._shard_size(len(data))))
+        return np.concatenate(list(results))
+
+    def explain(self, data, top_k = 3, approximate = False):
+        """
+        Principais fatores de churn (ver `explain.Explainer.explain`), com os shards distribuídos entre os workers
+        """
+        if self._executor is None:
+            raise RuntimeError("ParallelScorer deve ser usado como context manager")
+
+        shards = iter_shards(data, self._shard_size(len(data)))
+        return pd.concat(list(self._executor.map(_explain_shard, shards, repeat(top_k), repeat(approximate))))
@@ -1,33 +1,184 @@
+import os
+import time
+import argparse
+from functools import partial
 import pandas as pd
-import numpy as np
-from utils import load_model
+from .utils import load_model
+from .writers import get_writer, WRITERS
+from .parallel import ParallelScorer
+from .fast_predict import FastScorer
+from .instrumentation import stage, iter_stage, instrument_pipeline, session
+from .threshold import DEFAULT_THRESHOLD
+from .bundle import read_reference, model_version, model_lineage
+from .monitoring import DriftMonitor, format_report
 
-def make_predictions(model, data):
+# Colunas de identificação mantidas na saída quando presentes na entrada
+ID_COLUMNS = ['customerID', 'Churn']
+
+def make_predictions(model, data, threshold = None, cache = None):
     """
     Gera previsões e probabilidades com um modelo treinado
+
+    Sem `threshold`, usa o limiar salvo no bundle do modelo (ou o padrão).
+    Com um `cache` (`prediction_cache.PredictionCache`), as linhas com features
+    repetidas ou já pontuadas não são enviadas ao modelo.
     """
-    probabilities = model.predict_proba(data)[:,1]
-    predictions = (probabilities > 0.40).astype(int)
-    
+    if threshold is None:
+        threshold = getattr(model, 'threshold', DEFAULT_THRESHOLD)
+
+    if cache is not None:
+        probabilities = cache.predict_proba(model, data)
+    else:
+        with stage('predict', len(data)):
+            probabilities = model.predict_proba(data)[:,1]
+    predictions = (probabilities > threshold).astype(int)
+
     return predictions, probabilities
 
-if __name__=="__main__":
-    # Carregar os dados de teste
-    data = pd.read_csv("data/processed/test.csv")
+def read_in_chunks(path, chunksize):
+    """
+    Lê o arquivo de entrada (.csv ou .parquet) em blocos de `chunksize` linhas
+    """
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        batches = pq.ParquetFile(path).iter_batches(batch_size = chunksize)
+        return (batch.to_pandas() for batch in batches)
+
+    return pd.read_csv(path, chunksize = chunksize)
+
+def predict_in_batches(model, chunks, batch_size, explain = None, monitor = None, cache = None):
+    """
+    Gera as previsões bloco a bloco, chamando o modelo em lotes de `batch_size` linhas
+
+    Cada lote é devolvido como um DataFrame com as colunas de identificação,
+    `predicted` e `pred_probability`, sem acumular os resultados em memória.
+    Se `explain` for informado (uma função lote -> DataFrame, como
+    `Explainer.explain`), as colunas de explicação são adicionadas a cada lote.
+    Com um `monitor` (`monitoring.DriftMonitor`), cada bloco também é acumulado
+    no monitoramento de drift, na mesma passada. `cache` é repassado a
+    `make_predictions`.
+    """
+    for chunk in chunks:
+        if monitor is not None:
+            with stage('monitor', len(chunk)):
+                monitor.update(chunk)
+        id_columns = [col for col in ID_COLUMNS if col in chunk.columns]
+
+        for start in range(0, len(chunk), batch_size):
+            batch = chunk.iloc[start:start + batch_size]
+            predictions, probabilities = make_predictions(model, batch, cache = cache)
+
+            result = batch[id_columns].copy()
+            result['predicted'] = predictions
+            result['pred_probability'] = probabilities
+            if explain is not None:
+                with stage('explain', len(batch)):
+                    result = result.join(explain(batch))
+            yield result
+
+def score_file(model, input_path, output_path, chunksize = 100_000, batch_size = 10_000, fmt = None, explain = None,
+               monitor = None, cache = None):
+    """
+    Pontua um arquivo .csv ou .parquet em modo streaming e grava as predições incrementalmente
+
+    O formato de saída é definido por `fmt` ou pela extensão de `output_path`.
+    O uso de memória depende apenas de `chunksize` e `batch_size`, e não do
+    tamanho do arquivo de entrada. `explain`, `monitor` e `cache` são repassados
+    a `predict_in_batches`.
+    Retorna o total de linhas e o tempo decorrido.
+    """
+    start = time.perf_counter()
+    n_rows = 0
+
+    writer = get_writer(output_path, fmt)
+    try:
+        chunks = iter_stage('read', read_in_chunks(input_path, chunksize))
+        for result in predict_in_batches(model, chunks, batch_size, explain, monitor, cache):
+            with stage('write', len(result)):
+                writer.write(result)
+            n_rows += len(result)
+    finally:
+        with stage('write'):
+            writer.close()
+
+    elapsed = time.perf_counter() - start
+    return n_rows, elapsed
+
+def main(argv = None):
+    """
+    Ponto de entrada do subcomando `predict` (python -m scr predict)
+    """
+    parser = argparse.ArgumentParser(description = "Gera predições de churn em lotes")
+    parser.add_argument("--input", default = "data/processed/test.parquet")
+    parser.add_argument("--output", default = "data/processed/predictions.parquet")
+    parser.add_argument("--format", choices = list(WRITERS), default = None,
+                        help = "Formato de saída (padrão: extensão do arquivo; xlsx apenas para arquivos pequenos)")
+    parser.add_argument("--model", default = "models/classifier")
+    parser.add_argument("--chunksize", type = int, default = 100_000, help = "Linhas lidas por bloco")
+    parser.add_argument("--batch-size", type = int, default = 10_000,
+                        help = "Linhas por chamada de predict_proba (com --workers, o bloco inteiro)")
+    parser.add_argument("--fast", action = "store_true", help = "Com um modelo .pkl, usa o pontuador com tabelas congeladas (bundles já o usam)")
+    parser.add_argument("--workers", type = int, default = 1, help = "Processos de pontuação (1 = sem paralelismo)")
+    parser.add_argument("--shard-size", type = int, default = 5_000,
+                        help = "Máximo de linhas por shard enviado a cada worker")
+    parser.add_argument("--explain", type = int, default = 0, metavar = "K",
+                        help = "Adiciona os K principais fatores de churn (SHAP) de cada cliente")
+    parser.add_argument("--approximate-shap", action = "store_true",
+                        help = "Usa o SHAP aproximado do CatBoost (muito mais rápido) nas explicações")
+    parser.add_argument("--no-monitor", action = "store_true", help = "Desliga o monitoramento de drift e qualidade")
+    parser.add_argument("--monitor-report", default = None, metavar = "PATH",
+                        help = "Grava o relatório completo de drift em JSON")
+    parser.add_argument("--dedup", action = "store_true",
+                        help = "Pontua uma vez cada vetor de features distinto (cache em memória)")
+    parser.add_argument("--cache", default = None, metavar = "DIR",
+                        help = "Diretório do cache persistente de predições, ex.: data/cache/predictions (implica --dedup)")
+    parser.add_argument("--cache-size", type = int, default = 1_000_000, help = "Máximo de entradas no cache")
+    args = parser.parse_args(argv)
+
+    # Cache de predições indexado pelo modelo e pela versão dele
+    cache = None
+    if args.cache or args.dedup:
+        from .prediction_cache import PredictionCache
+        cache = PredictionCache(args.cache, model_version(args.model), args.cache_size,
+                                lineage = model_lineage(args.model))
 
-    # Carregar o modelo treinado
-    model = load_model("models/classifier.pkl")
+    # Monitoramento de drift contra a referência do treino salva no bundle
+    reference = None if args.no_monitor or not os.path.isdir(args.model) else read_reference(args.model)
+    monitor = DriftMonitor(reference) if reference is not None else None
 
-    # Fazer previsões
-    predictions, probabilities = make_predictions(model, data)
+    # Fazer previsões em lotes e salvar incrementalmente
+    with session('predict'):
+        if args.workers > 1:
+            with ParallelScorer(args.model, args.workers, args.shard_size) as model:
+                explain = None
+                if args.explain:
+                    explain = partial(model.explain, top_k = args.explain, approximate = args.approximate_shap)
+                # O bloco inteiro vai ao pool de uma vez: com lotes de `batch_size` só
+                # um lote ficaria em execução e os demais workers esperariam
+                n_rows, elapsed = score_file(model, args.input, args.output, args.chunksize,
+                                             max(args.batch_size, args.chunksize), args.format, explain, monitor, cache)
+        else:
+            with stage('load_model'):
+                model = instrument_pipeline(load_model(args.model))
+                if args.fast:
+                    model = FastScorer.from_pipeline(model)
+            explain = None
+            if args.explain:
+                from .explain import Explainer
+                explain = partial(Explainer(model, approximate = args.approximate_shap).explain, top_k = args.explain)
+            n_rows, elapsed = score_file(model, args.input, args.output, args.chunksize, args.batch_size,
+                                         args.format, explain, monitor, cache)
 
-    # Adicionar previsões ao DataFrame
-    data['predicted'] = predictions
-    data['pred_probability'] = probabilities
+    print(f'\nPredições salvas em "{args.output}"')
+    print(f"{n_rows} linhas em {elapsed:.2f}s ({n_rows / max(elapsed, 1e-9):,.0f} linhas/s)")
 
-    # Selecionar apenas as colunas necessárias
-    data = data[['Churn', 'predicted', 'pred_probability']]
+    if cache is not None:
+        print(f"Cache de predições: {cache.format_stats()}")
+        cache.close()
 
-    # Salvar predições em um arquivo .xlsx
-    data.to_excel("data/processed/predictions.xlsx", index=False)
-    print(f'\nPredições salvas em "data/processed/predictions.xlsx"')
\ No newline at end of file
+    if monitor is not None:
+        print("\nMonitoramento de drift e qualidade dos dados")
+        print(format_report(monitor.report(), only_flagged = True))
+        if args.monitor_report:
+            monitor.to_json(args.monitor_report)
+            print(f'Relatório completo salvo em "{args.monitor_report}"')
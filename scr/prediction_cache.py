@@ -0,0 +1,203 @@
+"""
+Cache de predições indexado pelo hash das features de cada cliente
+
+Muitos clientes têm o mesmo vetor de features e, entre execuções, boa parte
+da base não muda. `PredictionCache.predict_proba` calcula um hash de 64 bits
+das features usadas pelo modelo em cada linha, pontua apenas os vetores
+distintos que ainda não estão no cache e replica as probabilidades para todas
+as linhas.
+
+As entradas ficam em memória como arrays ordenados pelo hash, então a busca é
+vetorizada (`np.searchsorted`) e custa bem menos que pontuar. Com um
+diretório, o cache é persistido em um arquivo .npz por versão do modelo e
+limitado a `max_entries` entradas: as usadas há mais execuções saem primeiro.
+Os arquivos levam o prefixo da linhagem (o modelo de onde as versões saem), então
+modelos diferentes podem dividir o diretório sem apagar o cache um do outro.
+"""
+import os
+import glob
+import numpy as np
+import pandas as pd
+from .utils import FEATURES
+from .instrumentation import stage
+
+def row_hashes(data, columns = FEATURES):
+    """
+    Hash de 64 bits das features de cada linha
+
+    As numéricas são convertidas para float64 e as categóricas têm o mesmo hash
+    dos textos equivalentes, então o hash não depende de int16/int64 nem de
+    `category`/`object`.
+    """
+    frame = data[[col for col in columns if col in data.columns]]
+    numeric = [col for col in frame.columns
+               if pd.api.types.is_numeric_dtype(frame[col]) and not isinstance(frame[col].dtype, pd.CategoricalDtype)]
+    frame = frame.astype({col: np.float64 for col in numeric})
+
+    return pd.util.hash_pandas_object(frame, index = False).to_numpy()
+
+def _find(keys, sorted_keys):
+    """
+    Posição de cada chave em `sorted_keys` e máscara das encontradas
+    """
+    positions = np.searchsorted(sorted_keys, keys)
+    found = positions < len(sorted_keys)
+    found[found] = sorted_keys[positions[found]] == keys[found]
+
+    return positions, found
+
+class PredictionCache:
+    """
+    Cache de probabilidades por hash das features, para uma versão do modelo
+
+    Sem `path`, o cache vive só na execução (deduplicação). Com `path`, as
+    entradas de `model_version` são lidas de `path/<lineage>.<model_version>.npz`
+    e gravadas de volta em `save`/`close`, mantendo os arquivos das
+    `max_versions` versões mais recentes da mesma `lineage`. As estatísticas
+    (`rows`, `unique`, `hits`, `misses`) acumulam entre chamadas.
+    """
+    def __init__(self, path = None, model_version = None, max_entries = 1_000_000, max_versions = 3,
+                 lineage = 'default'):
+        self.path = path
+        self.model_version = model_version
+        self.lineage = lineage
+        self.max_entries = max_entries
+        self.max_versions = max_versions
+        self.rows = 0
+        self.unique = 0
+        self.hits = 0
+        self.misses = 0
+
+        # Entradas ordenadas pela chave, com a execução em que cada uma foi usada por último
+        self._keys = np.empty(0, dtype = np.int64)
+        self._values = np.empty(0, dtype = np.float64)
+        self._used = np.empty(0, dtype = np.int64)
+        self._generation = 0
+
+        if path is not None and os.path.exists(self._file):
+            with np.load(self._file) as data:
+                self._keys, self._values, self._used = data['keys'], data['values'], data['used']
+            self._generation = int(self._used.max(initial = -1)) + 1
+
+        # Entradas novas ainda não intercaladas (ordenadas, pequenas)
+        self._new_keys = np.empty(0, dtype = np.int64)
+        self._new_values = np.empty(0, dtype = np.float64)
+
+    @property
+    def _file(self):
+        return os.path.join(self.path, f"{self.lineage}.{self.model_version}.npz")
+
+    def __len__(self):
+        return len(self._keys) + len(self._new_keys)
+
+    def _lookup(self, keys):
+        """
+        Probabilidades em cache para as chaves ordenadas `keys` (NaN quando ausentes)
+        """
+        values = np.full(len(keys), np.nan)
+
+        positions, found = _find(keys, self._keys)
+        values[found] = self._values[positions[found]]
+        self._used[positions[found]] = self._generation
+
+        positions, found = _find(keys, self._new_keys)
+        values[found] = self._new_values[positions[found]]
+
+        return values
+
+    def _store(self, keys, values):
+        """
+        Guarda novas entradas; intercala com as principais quando passam de 1/4 delas
+        """
+        new_keys = np.concatenate([self._new_keys, keys])
+        order = np.argsort(new_keys, kind = 'stable')
+        self._new_keys, self._new_values = new_keys[order], np.concatenate([self._new_values, values])[order]
+
+        if len(self._new_keys) > max(len(self._keys) // 4, 65_536):
+            self._merge()
+
+    def _merge(self):
+        keys = np.concatenate([self._keys, self._new_keys])
+        order = np.argsort(keys, kind = 'stable')
+        self._keys = keys[order]
+        self._values = np.concatenate([self._values, self._new_values])[order]
+        self._used = np.concatenate([self._used, np.full(len(self._new_keys), self._generation)])[order]
+        self._new_keys = np.empty(0, dtype = np.int64)
+        self._new_values = np.empty(0, dtype = np.float64)
+
+    def predict_proba(self, model, data):
+        """
+        Probabilidade de churn de cada linha, pontuando só os vetores distintos ausentes do cache
+        """
+        with stage('cache', len(data)):
+            keys = row_hashes(data).view(np.int64)
+            unique, first, inverse = np.unique(keys, return_index = True, return_inverse = True)
+            values = self._lookup(unique)
+            missing = np.flatnonzero(np.isnan(values))
+
+        if len(missing):
+            with stage('predict', len(missing)):
+                values[missing] = model.predict_proba(data.iloc[first[missing]])[:, 1]
+            with stage('cache'):
+                self._store(unique[missing], values[missing])
+
+        self.rows += len(data)
+        self.unique += len(unique)
+        self.hits += len(unique) - len(missing)
+        self.misses += len(missing)
+
+        return values[inverse]
+
+    def save(self):
+        """
+        Grava o cache da versão atual (sem as entradas menos recentes além de `max_entries`)
+        """
+        self._merge()
+        if len(self._keys) > self.max_entries:
+            keep = np.sort(np.argsort(-self._used, kind = 'stable')[:self.max_entries])
+            self._keys, self._values, self._used = self._keys[keep], self._values[keep], self._used[keep]
+
+        if self.path is None:
+            return
+
+        os.makedirs(self.path, exist_ok = True)
+        tmp_path = f"{self._file}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, keys = self._keys, values = self._values, used = self._used)
+        os.replace(tmp_path, self._file)
+
+        # Mantém só os arquivos das versões mais recentes deste modelo; os de outras linhagens ficam
+        pattern = os.path.join(glob.escape(self.path), f"{glob.escape(self.lineage)}.*.npz")
+        files = sorted(glob.glob(pattern), key = os.path.getmtime, reverse = True)
+        for old in files[self.max_versions:]:
+            os.remove(old)
+
+    def stats(self):
+        """
+        Linhas, vetores distintos, acertos e fração das linhas que não precisaram ser pontuadas
+        """
+        return {
+            'rows': self.rows,
+            'unique': self.unique,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / max(self.unique, 1),
+            'saved': 1 - self.misses / max(self.rows, 1),
+            'entries': len(self)
+        }
+
+    def format_stats(self):
+        stats = self.stats()
+        return (f"{stats['rows']:,} linhas, {stats['unique']:,} vetores distintos, "
+                f"{stats['hits']:,} no cache (taxa de acerto {stats['hit_rate']:.1%}); "
+                f"{stats['saved']:.1%} das linhas não foram pontuadas")
+
+    def close(self):
+        self.save()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -0,0 +1,95 @@
+import time
+import argparse
+import pandas as pd
+from sklearn.base import clone
+from .utils import load_pipeline, FEATURES, TARGET
+from .dataset_store import load_splits, load_clean_data
+from .evaluate_model import evaluation
+from .train_model import class_weights, train_model, save_model, build_pipeline, load_params, BEST_PARAMS_PATH
+from .monitoring import build_reference
+from .backends import get_backend
+
+def incremental_update(pipeline, X_new, y_new, iterations = 200, learning_rate = None):
+    """
+    Retreino incremental: continua o boosting do modelo existente (`init_model`
+    no CatBoost e no LightGBM, `xgb_model` no XGBoost) usando apenas as novas linhas
+
+    O pré-processador fica congelado: as árvores antigas dividem pelos valores
+    do Target Encoding atual, e reajustá-lo mudaria as codificações sob elas.
+    Quando as codificações precisam mudar (categorias novas, médias que se
+    deslocaram), o caminho é o retreino completo (`--compare` ou `train`).
+
+    Retorna o pré-processador (o mesmo) e o novo modelo.
+    """
+    old_model = pipeline.named_steps['model']
+    preprocessor = pipeline.named_steps['preprocessor']
+
+    model = get_backend(old_model).warm_start(
+        old_model, preprocessor.transform(X_new), y_new, iterations, class_weights(y_new), learning_rate
+    )
+
+    return preprocessor, model
+
+def main(argv = None):
+    """
+    Ponto de entrada do subcomando `retrain` (python -m scr retrain)
+    """
+    parser = argparse.ArgumentParser(description = "Retreino incremental com novos dados mensais")
+    parser.add_argument("new_data", help = "Arquivo .csv com os novos dados no formato bruto")
+    parser.add_argument("--model", default = "models/classifier")
+    parser.add_argument("--output", default = "models/classifier")
+    parser.add_argument("--iterations", type = int, default = 200, help = "Novas árvores adicionadas ao modelo")
+    parser.add_argument("--learning-rate", type = float, default = None, help = "Padrão: o mesmo do modelo atual")
+    parser.add_argument("--compare", action = "store_true",
+                        help = "Compara com um retreino completo e grava o completo se o incremental perder ROC AUC")
+    parser.add_argument("--params", default = BEST_PARAMS_PATH, help = "Hiperparâmetros do retreino completo (CatBoost)")
+    parser.add_argument("--max-auc-drop", type = float, default = 0.01,
+                        help = "Perda máxima de ROC AUC do incremental em relação ao completo (com --compare)")
+    args = parser.parse_args(argv)
+
+    # Carregar o modelo atual, os dados de treino anteriores (via cache) e os novos dados
+    pipeline = load_pipeline(args.model)
+    X_old, X_test, y_old, y_test = load_splits("data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv", FEATURES, TARGET)
+    new_data = load_clean_data(args.new_data)
+    X_new, y_new = new_data[FEATURES], new_data[TARGET]
+
+    # Retreino incremental
+    start = time.perf_counter()
+    preprocessor, model = incremental_update(pipeline, X_new, y_new, args.iterations, args.learning_rate)
+    incremental_s = time.perf_counter() - start
+
+    results = {'incremental': evaluation(build_pipeline(model, preprocessor), X_test, y_test)}
+    timings = {'incremental': incremental_s}
+    candidates = {'incremental': (model, preprocessor)}
+
+    # Retreino completo para comparação
+    if args.compare:
+        X_full, y_full = pd.concat([X_old, X_new]), pd.concat([y_old, y_new])
+
+        start = time.perf_counter()
+        full_preprocessor = clone(pipeline.named_steps['preprocessor'])
+        backend = get_backend(pipeline.named_steps['model']).name
+        full_model = train_model(full_preprocessor.fit_transform(X_full, y_full), y_full, class_weights(y_full),
+                                 load_params(args.params, backend), backend)
+        timings['completo'] = time.perf_counter() - start
+
+        results['completo'] = evaluation(build_pipeline(full_model, full_preprocessor), X_test, y_test)
+        candidates['completo'] = (full_model, full_preprocessor)
+
+    report = pd.DataFrame(results)
+    report.loc['Tempo (s)'] = pd.Series(timings)
+    if args.compare:
+        report['delta'] = report['incremental'] - report['completo']
+
+    print("\nRetreino incremental")
+    print(f"{'-' * 25}")
+    print(report.round(4).to_string())
+
+    # O modelo atual só é substituído depois da comparação
+    chosen = 'incremental'
+    if args.compare and results['incremental']['ROC AUC'] < results['completo']['ROC AUC'] - args.max_auc_drop:
+        chosen = 'completo'
+        print(f"\nO incremental perdeu mais de {args.max_auc_drop:.4f} de ROC AUC; gravando o retreino completo")
+
+    model, preprocessor = candidates[chosen]
+    save_model(model, preprocessor, args.output, build_reference(pd.concat([X_old, X_new])))
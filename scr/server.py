@@ -0,0 +1,229 @@
+import json
+import time
+import queue
+import argparse
+import threading
+import numpy as np
+import pandas as pd
+from concurrent.futures import Future
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from .utils import load_model, load_pipeline
+from .predict import make_predictions
+from .fast_predict import FastScorer
+from .labels import validate_records
+from .bundle import read_threshold
+
+# Limites dos buckets dos histogramas de latência, em milissegundos
+LATENCY_BUCKETS_MS = [0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000]
+
+class Histogram:
+    """
+    Histograma com buckets fixos (latências em ms ou tamanhos de lote), seguro para uso entre threads
+    """
+    def __init__(self, buckets = LATENCY_BUCKETS_MS):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.n = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        idx = int(np.searchsorted(self.buckets, value))
+        with self._lock:
+            self.counts[idx] += 1
+            self.total += value
+            self.n += 1
+
+    def to_dict(self):
+        with self._lock:
+            labels = [f"<={b}" for b in self.buckets] + [f">{self.buckets[-1]}"]
+            return {
+                'count': self.n,
+                'mean': self.total / self.n if self.n else 0.0,
+                'buckets': dict(zip(labels, self.counts))
+            }
+
+class MicroBatcher:
+    """
+    Agrupa requisições concorrentes em micro-lotes antes de chamar o modelo
+
+    Um lote é fechado quando atinge `max_batch_size` linhas ou quando o prazo
+    de `max_wait_ms` desde a primeira requisição do lote expira. Sem
+    `threshold`, vale o limiar do próprio modelo (ver `make_predictions`).
+    """
+    def __init__(self, model, max_batch_size = 256, max_wait_ms = 5.0, threshold = None):
+        self.model = model
+        self.threshold = threshold
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32, 64, 128, 256, 512])
+        self.model_latency = Histogram()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target = self._run, daemon = True)
+        self._thread.start()
+
+    def submit(self, rows):
+        """
+        Enfileira uma lista de linhas já validadas (`labels.validate_records`) e retorna um Future com o resultado
+        """
+        future = Future()
+        self._queue.put((rows, future))
+        return future
+
+    def _collect(self):
+        """
+        Bloqueia até a primeira requisição e acumula as seguintes até o prazo ou o tamanho máximo
+        """
+        items = [self._queue.get()]
+        n_rows = len(items[0][0])
+        deadline = time.perf_counter() + self.max_wait
+
+        while n_rows < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout = timeout)
+            except queue.Empty:
+                break
+            items.append(item)
+            n_rows += len(item[0])
+
+        return items
+
+    def _score(self, rows):
+        start = time.perf_counter()
+        predictions, probabilities = make_predictions(self.model, pd.DataFrame(rows), self.threshold)
+        self.model_latency.observe((time.perf_counter() - start) * 1000)
+        self.batch_sizes.observe(len(rows))
+
+        return predictions, probabilities
+
+    def _run(self):
+        while True:
+            items = self._collect()
+            rows = [row for item_rows, _ in items for row in item_rows]
+
+            try:
+                predictions, probabilities = self._score(rows)
+            except Exception:
+                # Uma requisição inválida não pode derrubar as demais do lote:
+                # cada uma é pontuada sozinha e só as que falham recebem o erro
+                for item_rows, future in items:
+                    try:
+                        future.set_result(self._score(item_rows))
+                    except Exception as exc:
+                        future.set_exception(exc)
+                continue
+
+            offset = 0
+            for item_rows, future in items:
+                end = offset + len(item_rows)
+                future.set_result((predictions[offset:end], probabilities[offset:end]))
+                offset = end
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    """
+    Endpoints:
+
+    - POST /predict: recebe uma linha ou uma lista de linhas (objetos JSON);
+      entradas inválidas recebem 400 com a lista de erros
+    - GET /health: estado do serviço
+    - GET /metrics: histogramas de latência e tamanho de lote
+    """
+    batcher = None
+    request_latency = None
+    model_path = None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {'status': 'ok', 'model': self.model_path})
+        elif self.path == "/metrics":
+            self._send_json(200, {
+                'request_latency_ms': self.request_latency.to_dict(),
+                'model_latency_ms': self.batcher.model_latency.to_dict(),
+                'batch_size': self.batcher.batch_sizes.to_dict()
+            })
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._send_json(404, {'error': 'not found'})
+            return
+
+        start = time.perf_counter()
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            rows = payload if isinstance(payload, list) else [payload]
+            if not rows or not all(isinstance(row, dict) for row in rows):
+                raise ValueError("Esperado um objeto JSON ou uma lista não vazia de objetos")
+
+            # Validar antes de enfileirar: uma linha inválida não entra no lote
+            rows, errors = validate_records(rows)
+            if errors:
+                self._send_json(400, {'error': 'entrada inválida', 'errors': errors})
+                return
+            predictions, probabilities = self.batcher.submit(rows).result()
+        except (ValueError, KeyError, TypeError) as exc:
+            self._send_json(400, {'error': str(exc)})
+            return
+        except Exception as exc:
+            self._send_json(500, {'error': f"{type(exc).__name__}: {exc}"})
+            return
+
+        self._send_json(200, {
+            'predicted': predictions.tolist(),
+            'pred_probability': probabilities.tolist()
+        })
+        self.request_latency.observe((time.perf_counter() - start) * 1000)
+
+    def log_message(self, format, *args):
+        # Silencia o log por requisição do http.server
+        pass
+
+def create_server(model, host = "127.0.0.1", port = 8000, max_batch_size = 256, max_wait_ms = 5.0, model_path = None,
+                  threshold = None):
+    """
+    Cria o servidor HTTP de pontuação com micro-batching
+    """
+    handler = type("Handler", (ScoringHandler,), {
+        'batcher': MicroBatcher(model, max_batch_size, max_wait_ms, threshold),
+        'request_latency': Histogram(),
+        'model_path': model_path
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+def main(argv = None):
+    """
+    Ponto de entrada do subcomando `serve` (python -m scr serve)
+    """
+    parser = argparse.ArgumentParser(description = "Serviço HTTP local de pontuação de churn")
+    parser.add_argument("--model", default = "models/classifier")
+    parser.add_argument("--host", default = "127.0.0.1")
+    parser.add_argument("--port", type = int, default = 8000)
+    parser.add_argument("--max-batch-size", type = int, default = 256)
+    parser.add_argument("--max-wait-ms", type = float, default = 5.0)
+    parser.add_argument("--pipeline", action = "store_true", help = "Usa o Pipeline completo em vez do FastScorer")
+    args = parser.parse_args(argv)
+
+    # Carregar o modelo treinado uma única vez; o Pipeline não carrega o limiar
+    # salvo no bundle, então ele é lido do manifesto
+    if args.pipeline:
+        model = load_pipeline(args.model)
+    else:
+        model = FastScorer.from_pipeline(load_model(args.model))
+
+    server = create_server(
+        model, args.host, args.port, args.max_batch_size, args.max_wait_ms, args.model, read_threshold(args.model)
+    )
+    print(f"Servidor de pontuação em http://{args.host}:{args.port}")
+    server.serve_forever()
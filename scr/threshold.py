@@ -0,0 +1,147 @@
+"""
+Análise do limiar de decisão a partir de um único vetor de probabilidades
+
+As probabilidades são ordenadas uma vez e as matrizes de confusão de todos os
+limiares candidatos saem de somas acumuladas, em O(n log n), sem repontuar o
+modelo para cada limiar. O limiar é escolhido nas probabilidades fora do fold
+de uma validação cruzada no treino, nunca no conjunto de teste, que continua
+livre para o `evaluate`. O limiar escolhido é gravado no manifesto do bundle
+e lido por `predict.make_predictions` e pelo app.
+"""
+import argparse
+import numpy as np
+import pandas as pd
+
+# Limiar usado quando o modelo não tem um limiar salvo
+DEFAULT_THRESHOLD = 0.40
+
+# Premissas da campanha de retenção: custo por cliente contatado, perda por
+# cliente que cancela e fração dos clientes contatados que seriam retidos
+CONTACT_COST = 10.0
+CHURN_COST = 500.0
+RETENTION_RATE = 0.30
+
+# Métrica -> sentido da otimização
+METRICS = {
+    'f1': 'max',
+    'mcc': 'max',
+    'precision': 'max',
+    'recall': 'max',
+    'accuracy': 'max',
+    'lift': 'max',
+    'cost': 'min'
+}
+
+def threshold_curve(y_true, y_proba, contact_cost = CONTACT_COST, churn_cost = CHURN_COST,
+                    retention_rate = RETENTION_RATE):
+    """
+    Métricas em todos os limiares candidatos (um por valor distinto de probabilidade)
+
+    Cada linha corresponde a prever churn quando `probabilidade > threshold`,
+    como em `make_predictions`. A primeira linha não contata ninguém (limiar na
+    maior probabilidade) e a última contata todos. O custo esperado da campanha é o custo dos
+    contatos mais a perda dos churners não contatados e dos contatados que não
+    seriam retidos.
+    """
+    y_true = np.asarray(y_true, dtype = np.int64)
+    y_proba = np.asarray(y_proba, dtype = np.float64)
+
+    order = np.argsort(-y_proba, kind = 'mergesort')
+    scores, labels = y_proba[order], y_true[order]
+
+    # Último índice de cada grupo de probabilidades iguais
+    ends = np.flatnonzero(np.r_[scores[1:] != scores[:-1], True])
+    tp = np.r_[0, np.cumsum(labels)[ends]].astype(np.float64)
+    fp = np.r_[0, ends + 1] - tp
+
+    n, positives = len(labels), float(labels.sum())
+    fn = positives - tp
+    tn = (n - positives) - fp
+    contacted = tp + fp
+
+    # `probabilidade > threshold` seleciona exatamente os grupos até o atual;
+    # o limiar na maior probabilidade não seleciona nenhum
+    thresholds = np.r_[scores[0], scores[ends[1:]], np.nextafter(scores[-1], -np.inf)]
+
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        precision = tp / contacted
+        recall = tp / positives
+        f1 = 2 * tp / (2 * tp + fp + fn)
+        mcc = (tp * tn - fp * fn) / np.sqrt(contacted * (tp + fn) * (tn + fp) * (tn + fn))
+
+    return pd.DataFrame({
+        'threshold': thresholds,
+        'contacted': contacted / n,
+        'tp': tp.astype(np.int64),
+        'fp': fp.astype(np.int64),
+        'fn': fn.astype(np.int64),
+        'tn': tn.astype(np.int64),
+        'precision': precision,
+        'recall': recall,
+        'f1': f1,
+        'mcc': np.nan_to_num(mcc),
+        'accuracy': (tp + tn) / n,
+        'lift': precision / (positives / n),
+        'cost': contacted * contact_cost + (fn + tp * (1 - retention_rate)) * churn_cost
+    })
+
+def best_threshold(curve, metric = 'f1'):
+    """
+    Linha da curva com o melhor valor da métrica
+    """
+    values = curve[metric]
+    return curve.loc[values.idxmax() if METRICS[metric] == 'max' else values.idxmin()]
+
+def at_threshold(curve, threshold):
+    """
+    Linha da curva equivalente a usar `threshold` (o maior limiar candidato <= threshold)
+
+    Abaixo do menor candidato todos os clientes são contatados, como na última linha.
+    """
+    rows = curve[curve['threshold'] <= threshold]
+    return rows.iloc[0] if len(rows) else curve.iloc[-1]
+
+def main(argv = None):
+    """
+    Ponto de entrada do subcomando `threshold` (python -m scr threshold)
+    """
+    from .utils import load_model, load_pipeline, FEATURES, TARGET
+    from .bundle import set_threshold
+    from .dataset_store import load_splits
+    from .evaluate_model import out_of_fold_proba
+
+    parser = argparse.ArgumentParser(description = "Escolhe o limiar de decisão do modelo")
+    parser.add_argument("--model", default = "models/classifier")
+    parser.add_argument("--metric", choices = list(METRICS), default = 'f1')
+    parser.add_argument("--contact-cost", type = float, default = CONTACT_COST, help = "Custo por cliente contatado")
+    parser.add_argument("--churn-cost", type = float, default = CHURN_COST, help = "Perda por cliente que cancela")
+    parser.add_argument("--retention-rate", type = float, default = RETENTION_RATE,
+                        help = "Fração dos churners contatados que seriam retidos")
+    parser.add_argument("--splits", type = int, default = 5, help = "Folds da validação cruzada no treino")
+    parser.add_argument("--save", action = "store_true", help = "Grava o limiar escolhido no bundle")
+    args = parser.parse_args(argv)
+
+    # O limiar é escolhido nas probabilidades fora do fold do treino (via cache);
+    # o conjunto de teste fica reservado para o evaluate
+    model = load_model(args.model)
+    X_train, _, y_train, _ = load_splits("data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv", FEATURES, TARGET)
+    y_proba = out_of_fold_proba(load_pipeline(args.model), X_train, y_train, args.splits)
+
+    curve = threshold_curve(y_train, y_proba, args.contact_cost, args.churn_cost, args.retention_rate)
+    current = getattr(model, 'threshold', DEFAULT_THRESHOLD)
+    best = best_threshold(curve, args.metric)
+
+    report = pd.DataFrame({'atual': at_threshold(curve, current), f'melhor {args.metric}': best})
+    report.loc['threshold', 'atual'] = current
+    print(report.round(4).to_string())
+
+    if args.save:
+        set_threshold(args.model, float(best['threshold']), {
+            'metric': args.metric,
+            'selected_on': f'validação cruzada no treino ({args.splits} folds)',
+            'value': float(best[args.metric]),
+            'contact_cost': args.contact_cost,
+            'churn_cost': args.churn_cost,
+            'retention_rate': args.retention_rate
+        })
+        print(f"\nLimiar {best['threshold']:.4f} salvo em {args.model}")
@@ -1,11 +1,19 @@
+import os
+import gc
+import json
 import joblib
+import argparse
 import pandas as pd
 import numpy as np
-from catboost import CatBoostClassifier
 from sklearn.pipeline import Pipeline
 from sklearn.utils.class_weight import compute_class_weight
-from data_preprocessing import get_preprocessor
-from utils import load_data, split_data
+from .data_preprocessing import get_preprocessor
+from .utils import FEATURES, TARGET, peak_rss_mb
+from .dataset_store import load_splits
+from .bundle import save_bundle
+from .monitoring import build_reference
+from .backends import BACKENDS, get_backend
+from .instrumentation import stage, session
 
 def class_weights(y_train):
     """
@@ -19,70 +27,147 @@ def class_weights(y_train):
 
     return weights_dict
 
-def train_model(X_train, y_train, class_weights):
+def transform_to_memmap(preprocessor, X_train, y_train, path, chunksize = 100_000):
     """
-    Treina o modelo CatBoost com os hiperparâmetros otimizados
+    Ajusta o pré-processador e grava a matriz transformada uma única vez em disco
+
+    A matriz é escrita bloco a bloco em um arquivo .npy float32 e devolvida como
+    memmap somente leitura, sem manter uma cópia densa em memória.
     """
-    params = {'learning_rate': 0.006232617777096432, 
-            'depth': 9, 
-            'subsample': 0.6803560166453312, 
-            'colsample_bylevel': 0.9966486140633338, 
-            'min_data_in_leaf': 63}
-    
-    model = CatBoostClassifier(
-        **params, verbose = 0, class_weights=class_weights, random_state=42
-    )
+    preprocessor.fit(X_train, y_train)
+    n_features = preprocessor.transform(X_train.iloc[:1]).shape[1]
+
+    matrix = np.lib.format.open_memmap(path, mode = 'w+', dtype = np.float32, shape = (len(X_train), n_features))
+    for start in range(0, len(X_train), chunksize):
+        matrix[start:start + chunksize] = preprocessor.transform(X_train.iloc[start:start + chunksize])
+    matrix.flush()
+    del matrix
+
+    return np.load(path, mmap_mode = 'r')
+
+# Hiperparâmetros encontrados na busca offline do notebook de modelagem
+DEFAULT_PARAMS = {
+    'learning_rate': 0.006232617777096432,
+    'depth': 9,
+    'subsample': 0.6803560166453312,
+    'colsample_bylevel': 0.9966486140633338,
+    'min_data_in_leaf': 63
+}
+BEST_PARAMS_PATH = "models/best_params.json"
+
+def load_params(path = BEST_PARAMS_PATH, backend = 'catboost'):
+    """
+    Retorna os melhores hiperparâmetros salvos pela busca (tune.py) ou os padrões
+
+    A busca só cobre o CatBoost; os demais backends treinam com os padrões da biblioteca.
+    """
+    if backend != 'catboost':
+        return {}
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+
+    return DEFAULT_PARAMS
+
+def train_model(X_train, y_train, class_weights, params = None, backend = 'catboost'):
+    """
+    Treina o modelo do backend escolhido (CatBoost por padrão) com os hiperparâmetros informados
+
+    Os hiperparâmetros não são lidos aqui: quem chama passa `load_params(...)`
+    ou os próprios. Sem `params`, valem os padrões da biblioteca.
+    """
+    model = get_backend(backend).build(params or {}, class_weights)
     model.fit(X_train, y_train)
     print("\nTreinamento do modelo completo.")
-    
+
     return model
 
-def save_model(model, preprocessor, path):
+def build_pipeline(model, preprocessor):
     """
-    Salva o modelo treinado e o pré-processador em um pipeline
+    Junta o pré-processador e o modelo treinados em um pipeline
     """
-
-    pipeline = Pipeline([
+    return Pipeline([
         ('preprocessor', preprocessor),
         ('model', model)
     ])
 
-    joblib.dump(pipeline, path)
+MODEL_PATH = "models/classifier"
+
+def save_model(model, preprocessor, path = MODEL_PATH, reference = None):
+    """
+    Salva o modelo treinado e o pré-processador
+
+    Por padrão grava um bundle (diretório com o .cbm, as tabelas do
+    pré-processador e o manifesto); caminhos terminados em .pkl mantêm o
+    formato antigo, o Pipeline inteiro serializado com joblib. `reference`
+    (resumo das features do treino) vai para o bundle, para o monitoramento de drift.
+    """
+    pipeline = build_pipeline(model, preprocessor)
+
+    if path.endswith('.pkl'):
+        joblib.dump(pipeline, path)
+    else:
+        save_bundle(pipeline, path, reference)
     print(f"\nModelo salvo em {path}")
 
-if __name__=="__main__":
-    # Carregar dados e pré-processador
-    data = load_data('data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv')
-    preprocessor = get_preprocessor()
-
-    # Definição das features e target
-    features = [
-        'gender', 'SeniorCitizen', 'Partner', 'Dependents', 'tenure', 'PhoneService', 
-        'MultipleLines', 'InternetService', 'OnlineSecurity', 'OnlineBackup', 
-        'DeviceProtection', 'TechSupport', 'StreamingTV', 'StreamingMovies', 
-        'Contract', 'PaperlessBilling', 'PaymentMethod', 'MonthlyCharges', 'TotalCharges'
-    ]
-    target = 'Churn'
-
-    # Dividir os dados em treino e teste
-    X = data[features]
-    y = data[target]
-    X_train, X_test, y_train, y_test = split_data(X, y)
-    
-    # Calcular pesos das classes
-    weights_dict = class_weights(y_train)
-
-    # Salvar conjuntos de treino e teste
-    train_data = pd.concat([X_train, y_train], axis = 1)
-    train_data.to_csv("data/processed/train.csv", index = False)
-
-    test_data = pd.concat([X_test, y_test], axis = 1)
-    test_data.to_csv("data/processed/test.csv", index = False)
-
-    # Transformar os dados de treino
-    X_train_transformed = preprocessor.fit_transform(X_train, y_train)
-    X_train_transformed = pd.DataFrame(X_train_transformed)
-
-    # Treinar e salar o modelo
-    model = train_model(X_train_transformed, y_train, weights_dict)
-    save_model(model, preprocessor, "models/classifier.pkl")
\ No newline at end of file
+def main(argv = None):
+    """
+    Ponto de entrada do subcomando `train` (python -m scr train)
+    """
+    parser = argparse.ArgumentParser(description = "Treina o modelo de churn")
+    parser.add_argument("--data", default = "data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv")
+    parser.add_argument("--matrix", default = "data/cache/X_train.npy", help = "Arquivo da matriz transformada (memmap)")
+    parser.add_argument("--output", default = MODEL_PATH, help = "Diretório do bundle (ou arquivo .pkl)")
+    parser.add_argument("--streaming-encoder", action = "store_true",
+                        help = "Ajusta o Target Encoding por blocos (memória proporcional à cardinalidade)")
+    parser.add_argument("--in-memory", action = "store_true", help = "Transforma os dados em memória, sem memmap")
+    parser.add_argument("--backend", choices = list(BACKENDS), default = 'catboost', help = "Biblioteca do modelo")
+    parser.add_argument("--params", default = BEST_PARAMS_PATH, help = "Hiperparâmetros salvos pelo tune (CatBoost)")
+    args = parser.parse_args(argv)
+
+    # Hiperparâmetros lidos explicitamente, não a partir do diretório de trabalho dentro do train_model
+    params = load_params(args.params, args.backend)
+
+    with session('train'):
+        # Carregar pré-processador e dividir os dados em treino e teste (via cache)
+        preprocessor = get_preprocessor(streaming = args.streaming_encoder)
+        with stage('load') as measured:
+            X_train, X_test, y_train, y_test = load_splits(args.data, FEATURES, TARGET)
+            measured.add_rows(len(X_train) + len(X_test))
+
+        # Calcular pesos das classes
+        weights_dict = class_weights(y_train)
+
+        # Salvar conjuntos de treino e teste
+        with stage('save_splits', len(X_train) + len(X_test)):
+            train_data = pd.concat([X_train, y_train], axis = 1)
+            train_data.to_parquet("data/processed/train.parquet", index = False)
+
+            test_data = pd.concat([X_test, y_test], axis = 1)
+            test_data.to_parquet("data/processed/test.parquet", index = False)
+
+        # Referência das features do treino para o monitoramento de drift
+        reference = build_reference(X_train)
+
+        # Liberar as cópias que não são mais necessárias
+        del train_data, test_data, X_test, y_test
+        gc.collect()
+
+        # Transformar os dados de treino
+        with stage('preprocess', len(X_train)):
+            if args.in_memory:
+                X_train_transformed = pd.DataFrame(preprocessor.fit_transform(X_train, y_train))
+            else:
+                X_train_transformed = transform_to_memmap(preprocessor, X_train, y_train, args.matrix)
+        del X_train
+        gc.collect()
+
+        # Treinar e salar o modelo
+        with stage('train', len(y_train)):
+            model = train_model(X_train_transformed, y_train, weights_dict, params, args.backend)
+        with stage('save_model'):
+            save_model(model, preprocessor, args.output, reference)
+
+    peak = peak_rss_mb()
+    if peak is not None:
+        print(f"Pico de memória (RSS): {peak:.0f} MB")
@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import argparse
+import numpy as np
+from joblib import Parallel, delayed
+from catboost import CatBoostClassifier
+from .utils import FEATURES, TARGET
+from .dataset_store import load_splits, cache_key
+from .data_preprocessing import get_preprocessor
+from .evaluate_model import preprocess_folds, compute_metrics
+from .threshold import DEFAULT_THRESHOLD
+from .train_model import class_weights, BEST_PARAMS_PATH
+
+# Espaço de busca: (tipo, mínimo, máximo)
+SEARCH_SPACE = {
+    'learning_rate': ('log', 0.003, 0.3),
+    'depth': ('int', 4, 10),
+    'subsample': ('float', 0.5, 1.0),
+    'colsample_bylevel': ('float', 0.5, 1.0),
+    'min_data_in_leaf': ('int', 1, 100)
+}
+
+def sample_params(rng):
+    """
+    Sorteia uma configuração do espaço de busca
+    """
+    params = {}
+    for name, (kind, low, high) in SEARCH_SPACE.items():
+        if kind == 'log':
+            params[name] = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+        elif kind == 'int':
+            params[name] = int(rng.integers(low, high + 1))
+        else:
+            params[name] = float(rng.uniform(low, high))
+    return params
+
+def rungs(min_iterations, max_iterations, eta):
+    """
+    Orçamentos de iterações de cada rodada do successive halving
+    """
+    budgets = [min_iterations]
+    while budgets[-1] * eta < max_iterations:
+        budgets.append(budgets[-1] * eta)
+    return budgets + [max_iterations] if budgets[-1] < max_iterations else budgets
+
+def load_trials(path):
+    """
+    Lê os resultados já avaliados, indexados por (trial, iterações, fold)
+    """
+    trials = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                record = json.loads(line)
+                trials[(record['trial'], record['iterations'], record['fold'])] = record
+    return trials
+
+def evaluate_trial(params, iterations, fold, thread_count, metric):
+    """
+    Ajusta uma configuração em um fold pré-processado e retorna a métrica de validação
+    """
+    model = CatBoostClassifier(
+        **params, iterations = iterations, verbose = 0, random_state = 42,
+        class_weights = class_weights(fold['y_train']), thread_count = thread_count
+    )
+    model.fit(fold['X_train'], fold['y_train'])
+    y_proba = model.predict_proba(fold['X_test'])[:,1]
+
+    return compute_metrics(fold['y_test'], y_proba)[metric]
+
+def successive_halving(folds, n_trials = 27, min_iterations = 100, max_iterations = 1000, eta = 3,
+                       metric = 'ROC AUC', n_jobs = None, cpu_budget = None, seed = 42,
+                       trials_path = "models/tuning/trials.jsonl", data_key = None):
+    """
+    Busca de hiperparâmetros com successive halving sobre folds pré-processados
+
+    A cada rodada todas as configurações sobreviventes são avaliadas em paralelo
+    com o orçamento de iterações da rodada e apenas a melhor fração 1/eta segue
+    para a próxima. Cada avaliação (trial, iterações, fold) é gravada em
+    `trials_path` assim que termina, então uma busca interrompida é retomada
+    sem repetir o que já foi avaliado. `data_key` identifica os dados e o
+    pré-processamento dos folds (ver `main`).
+    """
+    cpu_budget = cpu_budget or os.cpu_count()
+    n_jobs = n_jobs or cpu_budget
+    thread_count = max(1, cpu_budget // n_jobs)
+
+    rng = np.random.default_rng(seed)
+    configs = {trial: sample_params(rng) for trial in range(n_trials)}
+    # Identifica a busca: resultados de outros dados, pré-processamento, métrica (e limiar),
+    # folds, seed ou orçamentos não são reaproveitados
+    study = "|".join(map(str, [
+        data_key, metric, DEFAULT_THRESHOLD, len(folds), seed, min_iterations, max_iterations, eta
+    ]))
+    done = load_trials(trials_path)
+    os.makedirs(os.path.dirname(trials_path), exist_ok = True)
+
+    survivors = list(configs)
+    for budget in rungs(min_iterations, max_iterations, eta):
+        tasks = [
+            (trial, fold_id) for trial in survivors for fold_id in range(len(folds))
+            if done.get((trial, budget, fold_id), {}).get('key') != [study, configs[trial]]
+        ]
+        start = time.perf_counter()
+        scores = Parallel(n_jobs = n_jobs, prefer = 'threads', return_as = 'generator')(
+            delayed(evaluate_trial)(configs[trial], budget, folds[fold_id], thread_count, metric)
+            for trial, fold_id in tasks
+        )
+
+        with open(trials_path, 'a') as f:
+            for (trial, fold_id), score in zip(tasks, scores):
+                record = {'trial': trial, 'iterations': budget, 'fold': fold_id,
+                          'key': [study, configs[trial]], 'score': score}
+                done[(trial, budget, fold_id)] = record
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+
+        mean_scores = {
+            trial: np.mean([done[(trial, budget, fold_id)]['score'] for fold_id in range(len(folds))])
+            for trial in survivors
+        }
+        ranking = sorted(survivors, key = mean_scores.get, reverse = True)
+        print(f"Rodada de {budget} iterações: {len(survivors)} configurações, "
+              f"melhor {metric} = {mean_scores[ranking[0]]:.4f} ({time.perf_counter() - start:.1f}s)")
+
+        best = ranking[0]
+        survivors = ranking[:max(1, len(survivors) // eta)]
+
+    return {**configs[best], 'iterations': budget}, mean_scores[best]
+
+def main(argv = None):
+    """
+    Ponto de entrada do subcomando `tune` (python -m scr tune)
+    """
+    parser = argparse.ArgumentParser(description = "Busca de hiperparâmetros do CatBoost")
+    parser.add_argument("--trials", type = int, default = 27)
+    parser.add_argument("--min-iterations", type = int, default = 100)
+    parser.add_argument("--max-iterations", type = int, default = 1000)
+    parser.add_argument("--eta", type = int, default = 3)
+    parser.add_argument("--splits", type = int, default = 3)
+    parser.add_argument("--metric", default = "ROC AUC", choices = ['Acurácia', 'F1 Score', 'ROC AUC', 'MCC'])
+    parser.add_argument("--jobs", type = int, default = None, help = "Avaliações simultâneas")
+    parser.add_argument("--cpu-budget", type = int, default = None, help = "Total de núcleos a utilizar")
+    parser.add_argument("--seed", type = int, default = 42)
+    parser.add_argument("--trials-path", default = "models/tuning/trials.jsonl")
+    parser.add_argument("--output", default = BEST_PARAMS_PATH)
+    args = parser.parse_args(argv)
+
+    # Dividir os dados em treino e teste (via cache); a busca usa apenas o treino
+    data_path = "data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv"
+    X_train, _, y_train, _ = load_splits(data_path, FEATURES, TARGET)
+
+    # Pré-processar os folds uma única vez para todas as configurações
+    preprocessor = get_preprocessor()
+    folds = preprocess_folds(preprocessor, X_train, y_train, n_splits = args.splits, random_state = args.seed)
+
+    # Hash do arquivo, versão da limpeza, features e pré-processador: os trials
+    # gravados só valem para os mesmos folds
+    data_key = cache_key(data_path, FEATURES, TARGET, preprocessor)
+    best_params, best_score = successive_halving(
+        folds, args.trials, args.min_iterations, args.max_iterations, args.eta,
+        args.metric, args.jobs, args.cpu_budget, args.seed, args.trials_path, data_key
+    )
+
+    # Salvar os melhores hiperparâmetros para o train_model
+    with open(args.output, 'w') as f:
+        json.dump(best_params, f, indent = 4)
+
+    print(f"\nMelhor {args.metric}: {best_score:.4f}")
+    print(f"Hiperparâmetros salvos em {args.output}: {best_params}")
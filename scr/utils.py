@@ -1,23 +1,77 @@
-import joblib
+import os
+import sys
 import pandas as pd 
-import numpy as np
-from sklearn.model_selection import train_test_split
 
-def load_data(path):
+# Esquema declarado das 21 colunas do dataset Telco
+def _service_dtype(service):
+    return pd.CategoricalDtype(['No', 'Yes', f'No {service} service'])
+
+YES_NO = pd.CategoricalDtype(['No', 'Yes'])
+
+TELCO_SCHEMA = {
+    'customerID': 'object',
+    'gender': pd.CategoricalDtype(['Female', 'Male']),
+    'SeniorCitizen': pd.CategoricalDtype([0, 1]),
+    'Partner': YES_NO,
+    'Dependents': YES_NO,
+    'tenure': 'int16',
+    'PhoneService': YES_NO,
+    'MultipleLines': _service_dtype('phone'),
+    'InternetService': pd.CategoricalDtype(['DSL', 'Fiber optic', 'No']),
+    'OnlineSecurity': _service_dtype('internet'),
+    'OnlineBackup': _service_dtype('internet'),
+    'DeviceProtection': _service_dtype('internet'),
+    'TechSupport': _service_dtype('internet'),
+    'StreamingTV': _service_dtype('internet'),
+    'StreamingMovies': _service_dtype('internet'),
+    'Contract': pd.CategoricalDtype(['Month-to-month', 'One year', 'Two year']),
+    'PaperlessBilling': YES_NO,
+    'PaymentMethod': pd.CategoricalDtype([
+        'Bank transfer (automatic)', 'Credit card (automatic)', 'Electronic check', 'Mailed check'
+    ]),
+    'MonthlyCharges': 'float32',
+    'TotalCharges': 'float32',
+    'Churn': YES_NO
+}
+
+# Features usadas pelo modelo e variável alvo
+FEATURES = [
+    'gender', 'SeniorCitizen', 'Partner', 'Dependents', 'tenure', 'PhoneService',
+    'MultipleLines', 'InternetService', 'OnlineSecurity', 'OnlineBackup',
+    'DeviceProtection', 'TechSupport', 'StreamingTV', 'StreamingMovies',
+    'Contract', 'PaperlessBilling', 'PaymentMethod', 'MonthlyCharges', 'TotalCharges'
+]
+TARGET = 'Churn'
+
+def load_data(path, engine = 'c'):
     """
-    Carrega os dados e faz os tratamentos necessários
+    Carrega os dados com o esquema declarado e faz os tratamentos necessários
+
+    Os tipos são definidos na leitura (categóricas como `category`, numéricas
+    como int16/float32) e os valores em branco de `TotalCharges` já são lidos
+    como nulos, evitando cópias extras das colunas. `engine = 'pyarrow'` usa o
+    leitor multithread do pyarrow.
     """
-    df = pd.read_csv(path)
+    if engine == 'pyarrow':
+        # O engine pyarrow não aceita na_values por coluna
+        na_options = {'na_values': [' ', ''], 'keep_default_na': False}
+    else:
+        na_options = {'na_values': {'TotalCharges': [' ']}}
 
-    # Corrigindo o mapeamento de SeniorCitizen
-    df['SeniorCitizen'] = df['SeniorCitizen'].map({0: 'No', 0: 'Yes'})
+    df = pd.read_csv(path, dtype = TELCO_SCHEMA, engine = engine, **na_options)
 
-    # Convertendo a variável target para binária
-    df['Churn'] = df['Churn'].map({'No': 0, 'Yes': 1})
+    # Ajustando SeniorCitizen de binário numérico para texto ('No', 'Yes')
+    df['SeniorCitizen'] = df['SeniorCitizen'].cat.rename_categories(['No', 'Yes'])
 
-    # Tratando valores faltantes e problemas de preenchimento
-    df['TotalCharges'] = df['TotalCharges'].replace(' ', np.nan)
-    df['TotalCharges'] = df['TotalCharges'].astype(float)
+    # Convertendo a variável target para binária; rótulos fora de ('No', 'Yes')
+    # são lidos como nulos e virariam o código -1, uma terceira classe
+    invalid = df['Churn'].isna()
+    if invalid.any():
+        raise ValueError(
+            f"Churn com {invalid.sum()} valores vazios ou fora de {list(YES_NO.categories)} "
+            f"(linhas {', '.join(map(str, df.index[invalid][:5]))})"
+        )
+    df['Churn'] = df['Churn'].cat.codes
 
     return df
 
@@ -25,11 +79,41 @@ def split_data(X, y, test_size = 0.20, random_state = 42):
     """
     Divide os dados em treino e teste
     """
+    from sklearn.model_selection import train_test_split
+
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state)
     return X_train, X_test, y_train, y_test
 
+def peak_rss_mb():
+    """
+    Pico de memória residente (RSS) do processo em MB, ou None fora de sistemas POSIX
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é dado em KB no Linux e em bytes no macOS
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
 def load_model(path):
     """
     Carrega o modelo treinado
+
+    Um diretório é aberto como bundle (`bundle.ModelBundle`, com o CatBoost lido
+    sob demanda); um arquivo .pkl, como o Pipeline serializado com joblib.
+    """
+    if os.path.isdir(path):
+        from .bundle import load_bundle
+        return load_bundle(path)
+
+    import joblib
+    return joblib.load(path)
+
+def load_pipeline(path):
+    """
+    Carrega o Pipeline sklearn completo, de um bundle ou de um .pkl
     """
-    return joblib.load(path)
\ No newline at end of file
+    model = load_model(path)
+    return getattr(model, 'pipeline', model)
\ No newline at end of file
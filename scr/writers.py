@@ -0,0 +1,124 @@
+import os
+import pandas as pd
+
+# Limite de linhas para exportação em Excel (apenas para arquivos pequenos)
+MAX_EXCEL_ROWS = 100_000
+
+class CSVWriter:
+    """
+    Grava os lotes de predições em um único arquivo .csv, em modo append
+    """
+    def __init__(self, path):
+        self.path = path
+        self._header = True
+
+    def write(self, df):
+        df.to_csv(self.path, mode = 'w' if self._header else 'a', header = self._header, index = False)
+        self._header = False
+
+    def close(self):
+        pass
+
+class ParquetWriter:
+    """
+    Grava os lotes de predições em um arquivo .parquet, um row group por lote
+    """
+    def __init__(self, path, compression = 'snappy'):
+        self.path = path
+        self.compression = compression
+        self._writer = None
+        self._schema = None
+
+    def write(self, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._writer is None:
+            table = pa.Table.from_pandas(df, preserve_index = False)
+            self._schema = table.schema
+            self._writer = pq.ParquetWriter(self.path, self._schema, compression = self.compression)
+        else:
+            table = pa.Table.from_pandas(df, schema = self._schema, preserve_index = False)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+class ArrowWriter:
+    """
+    Grava os lotes de predições em um arquivo Arrow IPC (Feather v2), um record batch por lote
+    """
+    def __init__(self, path):
+        self.path = path
+        self._sink = None
+        self._writer = None
+        self._schema = None
+
+    def write(self, df):
+        import pyarrow as pa
+
+        if self._writer is None:
+            batch = pa.RecordBatch.from_pandas(df, preserve_index = False)
+            self._schema = batch.schema
+            self._sink = pa.OSFile(self.path, 'wb')
+            self._writer = pa.ipc.new_file(self._sink, self._schema)
+        else:
+            batch = pa.RecordBatch.from_pandas(df, schema = self._schema, preserve_index = False)
+        self._writer.write_batch(batch)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._sink.close()
+
+class ExcelWriter:
+    """
+    Acumula os lotes e grava um arquivo .xlsx ao final
+
+    O openpyxl não permite escrita incremental, por isso o formato fica restrito
+    a exportações pequenas (até `MAX_EXCEL_ROWS` linhas).
+    """
+    def __init__(self, path, max_rows = MAX_EXCEL_ROWS):
+        self.path = path
+        self.max_rows = max_rows
+        self._frames = []
+        self._n_rows = 0
+
+    def write(self, df):
+        self._n_rows += len(df)
+        if self._n_rows > self.max_rows:
+            raise ValueError(
+                f"Exportação em Excel limitada a {self.max_rows} linhas, use parquet, arrow ou csv"
+            )
+        self._frames.append(df)
+
+    def close(self):
+        if self._frames:
+            pd.concat(self._frames, ignore_index = True).to_excel(self.path, index = False)
+
+WRITERS = {
+    'csv': CSVWriter,
+    'parquet': ParquetWriter,
+    'arrow': ArrowWriter,
+    'xlsx': ExcelWriter
+}
+
+EXTENSIONS = {
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.xlsx': 'xlsx'
+}
+
+def get_writer(path, fmt = None):
+    """
+    Retorna o writer adequado ao formato informado ou à extensão do arquivo
+    """
+    if fmt is None:
+        fmt = EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if fmt not in WRITERS:
+        raise ValueError(f"Formato de saída não suportado: {fmt}. Opções: {', '.join(WRITERS)}")
+
+    return WRITERS[fmt](path)
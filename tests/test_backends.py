@@ -0,0 +1,49 @@
+"""
+Ida e volta dos modelos pelo bundle: gravar, ler, pontuar e clonar (validação cruzada)
+"""
+import numpy as np
+import pytest
+from sklearn.base import clone
+from scr.backends import BACKENDS
+
+def make_data(n_rows = 500, seed = 0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size = (n_rows, 5)).astype(np.float32)
+    y = (X[:, 0] + rng.normal(scale = 0.5, size = n_rows) > 0.3).astype(int)
+    return X, y
+
+def fit(backend, X, y):
+    if backend.name == 'catboost':
+        params = {'iterations': 20, 'allow_writing_files': False}
+    else:
+        params = {'n_estimators': 20}
+    return backend.build(params, {0: 1.0, 1: 2.0}).fit(X, y)
+
+@pytest.mark.parametrize('name', list(BACKENDS))
+def test_save_load_round_trip(tmp_path, name):
+    backend = BACKENDS[name]
+    X, y = make_data()
+    model = fit(backend, X, y)
+
+    backend.save(model, str(tmp_path / backend.model_file))
+    loaded = backend.load(str(tmp_path / backend.model_file))
+
+    np.testing.assert_allclose(backend.predict_proba(loaded, X, 1), backend.predict_proba(model, X, 1), rtol = 1e-6)
+    np.testing.assert_allclose(loaded.predict_proba(X), model.predict_proba(X), rtol = 1e-6)
+    np.testing.assert_array_equal(loaded.predict(X), model.predict(X))
+
+def test_lightgbm_loaded_model_can_be_cloned_and_refit(tmp_path):
+    # O LGBMClassifier lido tem o estado de ajuste refeito à mão (atributos privados
+    # do lightgbm): este teste quebra se uma versão nova mudar esses atributos
+    backend = BACKENDS['lightgbm']
+    X, y = make_data()
+    model = fit(backend, X, y)
+    backend.save(model, str(tmp_path / backend.model_file))
+    loaded = backend.load(str(tmp_path / backend.model_file))
+
+    assert loaded.get_params() == model.get_params()
+    np.testing.assert_array_equal(loaded.classes_, model.classes_)
+    assert loaded.n_features_in_ == model.n_features_in_
+
+    refit = clone(loaded).fit(X, y)
+    np.testing.assert_allclose(refit.predict_proba(X), model.predict_proba(X), rtol = 1e-6)
@@ -0,0 +1,50 @@
+"""
+Validação da entrada do FastScorer em todos os caminhos (linha, lista pequena, lista grande, DataFrame)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from scr.fast_predict import FastScorer, SMALL_BATCH
+
+TABLES = {
+    'cat_features': ['Contract'],
+    'num_features': ['tenure'],
+    'fill_values': {'Contract': 'Month-to-month'},
+    'categories': {'Contract': np.array(['Month-to-month', 'One year'], dtype = object)},
+    'encodings': {'Contract': np.array([0.4, 0.1])},
+    'unknown': {'Contract': 0.25},
+    'medians': np.array([29.0])
+}
+
+ROW = {'Contract': 'One year', 'tenure': 12}
+
+@pytest.fixture
+def scorer():
+    return FastScorer(TABLES, None)
+
+@pytest.mark.parametrize('n_rows', [1, SMALL_BATCH + 1])
+def test_rows_and_frame_encode_the_same(scorer, n_rows):
+    rows = [ROW] * n_rows
+    expected = np.tile([0.1, 12.0], (n_rows, 1))
+    np.testing.assert_array_equal(scorer.transform(rows), expected)
+    np.testing.assert_array_equal(scorer.transform(pd.DataFrame(rows)), expected)
+
+@pytest.mark.parametrize('n_rows', [1, SMALL_BATCH + 1])
+def test_missing_column_is_rejected(scorer, n_rows):
+    rows = [ROW] * (n_rows - 1) + [{'Contract': 'One year'}]
+    with pytest.raises(KeyError, match = 'tenure'):
+        scorer.transform(rows)
+    with pytest.raises(KeyError, match = 'tenure'):
+        scorer.transform(pd.DataFrame(rows).drop(columns = 'tenure'))
+
+def test_missing_column_in_single_row_is_rejected(scorer):
+    with pytest.raises(KeyError, match = 'Contract'):
+        scorer.transform({'tenure': 12})
+
+@pytest.mark.parametrize('data', [[ROW, 'garbage'], [ROW] * SMALL_BATCH + [[1, 2]], 'garbage'])
+def test_non_dict_rows_are_rejected(scorer, data):
+    with pytest.raises(TypeError):
+        scorer.transform(data)
+
+def test_null_values_are_imputed(scorer):
+    np.testing.assert_array_equal(scorer.transform({'Contract': None, 'tenure': np.nan}), [[0.4, 29.0]])
@@ -0,0 +1,39 @@
+"""
+Validação das linhas de entrada: caminho em Python puro, pequeno e vetorizado de `prepare_input`
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from scr.labels import prepare_input, validate_records, SMALL_INPUT
+from scr.utils import FEATURES
+
+ROW = {
+    'gender': 'Feminino', 'SeniorCitizen': 0, 'Partner': 'Sim', 'Dependents': 'Não', 'tenure': 12,
+    'PhoneService': 'Sim', 'MultipleLines': 'Não', 'InternetService': 'Fibra ótica', 'OnlineSecurity': 'Não',
+    'OnlineBackup': 'Sim', 'DeviceProtection': 'Não', 'TechSupport': 'Não', 'StreamingTV': 'Sim',
+    'StreamingMovies': 'Não', 'Contract': 'Month-to-month', 'PaperlessBilling': 'Sim',
+    'PaymentMethod': 'Electronic check', 'MonthlyCharges': 70.5, 'TotalCharges': ' '
+}
+
+def test_records_are_translated():
+    records, errors = validate_records([ROW])
+    assert errors == []
+    assert records[0]['gender'] == 'Female' and records[0]['SeniorCitizen'] == 'No'
+    assert records[0]['tenure'] == 12.0 and np.isnan(records[0]['TotalCharges'])
+
+def test_missing_column_is_reported():
+    records, errors = validate_records([ROW, {k: v for k, v in ROW.items() if k != 'tenure'}])
+    assert records is None
+    assert errors == ["Colunas ausentes: tenure"]
+
+def test_invalid_values_are_reported():
+    _, errors = validate_records([{**ROW, 'Contract': 'Weekly', 'MonthlyCharges': 'abc'}])
+    assert errors == ["Contract: 1 valores desconhecidos (Weekly)", "MonthlyCharges: 1 valores numéricos inválidos"]
+
+@pytest.mark.parametrize('n_rows', [1, SMALL_INPUT + 1])
+def test_prepare_input_paths_agree(n_rows):
+    data = pd.DataFrame([ROW, {**ROW, 'Contract': 'Weekly', 'tenure': -1}] * n_rows)
+    prepared, errors = prepare_input(data)
+    assert errors == [f"Contract: {n_rows} valores desconhecidos (Weekly)", f"tenure: {n_rows} valores numéricos inválidos"]
+    assert list(prepared.columns) == FEATURES
+    assert prepared['Contract'].isna().sum() == n_rows and prepared['tenure'].dtype == np.float32
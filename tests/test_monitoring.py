@@ -0,0 +1,33 @@
+"""
+Referência e relatório do monitoramento de drift em colunas vazias
+"""
+import numpy as np
+import pandas as pd
+from scr.monitoring import DriftMonitor, build_reference
+
+def make_data(n_rows = 1_000, seed = 0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'tenure': rng.integers(0, 72, n_rows).astype(np.float64),
+        'Contract': pd.Categorical(rng.choice(['Month-to-month', 'One year', 'Two year'], n_rows))
+    })
+
+def test_reference_with_all_null_numeric_column():
+    data = make_data().assign(tenure = np.nan)
+    reference = build_reference(data)
+
+    assert reference['features']['tenure'] == {'type': 'numeric', 'null_rate': 1.0, 'edges': [], 'proportions': [0.0]}
+    assert DriftMonitor(reference).update(data).report().loc['tenure', 'status'] == 'alerta'
+
+def test_fully_null_input_is_flagged():
+    reference = build_reference(make_data())
+    empty = make_data(seed = 1).assign(tenure = np.nan, Contract = pd.Categorical([None] * 1_000))
+
+    report = DriftMonitor(reference).update(empty).report()
+    assert (report['status'] == 'alerta').all()
+    assert report['psi'].isna().all()
+
+def test_same_distribution_is_ok():
+    reference = build_reference(make_data())
+    report = DriftMonitor(reference).update(make_data(seed = 1)).report()
+    assert (report['status'] == 'ok').all()
@@ -0,0 +1,104 @@
+"""
+Hash das features, paridade com a pontuação direta e despejo do cache de predições
+"""
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from scr.prediction_cache import PredictionCache, row_hashes
+
+class CountingModel:
+    """
+    Modelo determinístico que registra quantas linhas pontuou
+    """
+    def __init__(self):
+        self.scored = 0
+
+    def predict_proba(self, data):
+        self.scored += len(data)
+        proba = (data['tenure'].to_numpy(dtype = np.float64) % 10 + data['MonthlyCharges'].to_numpy()) / 200
+        return np.column_stack([1 - proba, proba])
+
+def make_data(n_rows = 500, seed = 0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'tenure': rng.integers(0, 20, n_rows).astype(np.int16),
+        'Contract': rng.choice(['Month-to-month', 'One year', 'Two year'], n_rows),
+        'MonthlyCharges': rng.choice([20.0, 50.5, 99.9], n_rows)
+    })
+
+def test_hash_ignores_integer_width():
+    data = make_data()
+    np.testing.assert_array_equal(row_hashes(data), row_hashes(data.astype({'tenure': np.int64})))
+
+def test_hash_ignores_category_vs_object():
+    data = make_data()
+    np.testing.assert_array_equal(row_hashes(data), row_hashes(data.astype({'Contract': 'category'})))
+
+def test_hash_changes_with_values():
+    data = make_data()
+    changed = data.assign(MonthlyCharges = data['MonthlyCharges'] + 1)
+    assert not np.any(row_hashes(data) == row_hashes(changed))
+
+def test_cached_predictions_match_direct_scoring():
+    data = make_data()
+    model = CountingModel()
+    expected = CountingModel().predict_proba(data)[:, 1]
+
+    cache = PredictionCache()
+    np.testing.assert_array_equal(cache.predict_proba(model, data), expected)
+    assert model.scored == len(data.drop_duplicates())
+
+    # Segunda passada: nada é pontuado de novo
+    np.testing.assert_array_equal(cache.predict_proba(model, data), expected)
+    assert model.scored == len(data.drop_duplicates())
+
+def test_persisted_cache_is_reused(tmp_path):
+    data = make_data()
+    with PredictionCache(str(tmp_path), 'v1') as cache:
+        cache.predict_proba(CountingModel(), data)
+
+    model = CountingModel()
+    with PredictionCache(str(tmp_path), 'v1') as cache:
+        np.testing.assert_array_equal(cache.predict_proba(model, data), CountingModel().predict_proba(data)[:, 1])
+    assert model.scored == 0
+
+def test_max_entries_evicts_least_recently_used(tmp_path):
+    old, recent = make_data(seed = 1).iloc[:1], make_data(seed = 2).iloc[:1].assign(tenure = 99)
+
+    with PredictionCache(str(tmp_path), 'v1', max_entries = 1) as cache:
+        cache.predict_proba(CountingModel(), old)
+    with PredictionCache(str(tmp_path), 'v1', max_entries = 1) as cache:
+        cache.predict_proba(CountingModel(), recent)
+
+    model = CountingModel()
+    with PredictionCache(str(tmp_path), 'v1', max_entries = 1) as cache:
+        assert len(cache) == 1
+        cache.predict_proba(model, recent)
+        assert model.scored == 0
+        cache.predict_proba(model, old)
+        assert model.scored == 1
+
+def test_old_versions_pruned_only_within_lineage(tmp_path):
+    data = make_data().iloc[:10]
+    with PredictionCache(str(tmp_path), 'v1', lineage = 'other') as cache:
+        cache.predict_proba(CountingModel(), data)
+
+    for version in ['v1', 'v2', 'v3']:
+        with PredictionCache(str(tmp_path), version, max_versions = 2, lineage = 'model') as cache:
+            cache.predict_proba(CountingModel(), data)
+        # Horários de modificação distintos mesmo em sistemas de arquivos com resolução baixa
+        os.utime(cache._file, (0, int(version[1:])))
+
+    assert sorted(os.listdir(tmp_path)) == ['model.v2.npz', 'model.v3.npz', 'other.v1.npz']
+
+@pytest.mark.parametrize('dtype', [np.int16, np.int32, np.int64, np.float64])
+def test_cache_hits_across_numeric_dtypes(dtype):
+    data = make_data()
+    model = CountingModel()
+    cache = PredictionCache()
+    cache.predict_proba(model, data)
+    scored = model.scored
+
+    cache.predict_proba(model, data.astype({'tenure': dtype}))
+    assert model.scored == scored
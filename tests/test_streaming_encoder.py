@@ -0,0 +1,69 @@
+"""
+Paridade do StreamingTargetEncoder com o par CategoricalImputer + TargetEncoder do category_encoders
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from category_encoders import TargetEncoder
+from feature_engine.imputation import CategoricalImputer
+from sklearn.pipeline import Pipeline
+from scr.data_preprocessing import StreamingTargetEncoder
+
+def make_data(n_rows = 2_000, seed = 0):
+    """
+    Duas categóricas com frequências e taxas de churn diferentes, com nulos e uma categoria rara
+    """
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame({
+        'Contract': rng.choice(['Month-to-month', 'One year', 'Two year'], n_rows, p = [0.55, 0.25, 0.20]),
+        'PaymentMethod': rng.choice(['Electronic check', 'Mailed check', 'Bank transfer', 'Rare'], n_rows,
+                                    p = [0.50, 0.30, 0.195, 0.005])
+    }).astype('category')
+    y = pd.Series((rng.random(n_rows) < np.where(data['Contract'] == 'Month-to-month', 0.45, 0.1)).astype(int))
+
+    data.loc[rng.random(n_rows) < 0.03, 'Contract'] = np.nan
+    data.loc[rng.random(n_rows) < 0.03, 'PaymentMethod'] = np.nan
+
+    return data, y
+
+def reference_encoder():
+    return Pipeline([
+        ('cat_imput', CategoricalImputer(imputation_method = 'frequent')),
+        ('cat_encoding', TargetEncoder())
+    ])
+
+@pytest.fixture(scope = 'module')
+def fitted():
+    X, y = make_data()
+    return X, reference_encoder().fit(X, y), StreamingTargetEncoder(chunksize = 300).fit(X, y)
+
+def assert_same_transform(reference, streaming, X):
+    np.testing.assert_allclose(
+        streaming.transform(X).to_numpy(), np.asarray(reference.transform(X), dtype = np.float64), rtol = 0, atol = 1e-12
+    )
+
+def test_seen_categories(fitted):
+    X, reference, streaming = fitted
+    assert_same_transform(reference, streaming, X.dropna())
+
+def test_unseen_categories(fitted):
+    X, reference, streaming = fitted
+    unseen = X.dropna().head(50).astype(object)
+    unseen.iloc[::2, 0] = 'Weekly'
+    unseen.iloc[1::3, 1] = 'Crypto'
+    assert_same_transform(reference, streaming, unseen)
+
+def test_missing_categories(fitted):
+    X, reference, streaming = fitted
+    missing = X[X.isna().any(axis = 1)]
+    assert len(missing)
+    assert_same_transform(reference, streaming, missing)
+
+def test_partial_fit_matches_fit():
+    X, y = make_data(seed = 1)
+    full = StreamingTargetEncoder().fit(X, y)
+    chunked = StreamingTargetEncoder()
+    for start in range(0, len(X), 700):
+        chunked.partial_fit(X.iloc[start:start + 700], y.iloc[start:start + 700])
+
+    np.testing.assert_allclose(chunked.transform(X).to_numpy(), full.transform(X).to_numpy(), rtol = 0, atol = 1e-12)